@@ -3,7 +3,7 @@ from __future__ import annotations
 """Self-test: seed a tiny corpus, run dd-val, and score results.
 
 Usage:
-  uv run scripts/selftest.py [--projects N] [--rows N] [--seed N] [--keep]
+  uv run scripts/selftest.py [--projects N] [--rows N] [--seed N] [--keep] [--on-disk]
 
 This script performs a fast, deterministic end-to-end check:
   1) Seeds a small evaluation corpus (clean + perturbed v1/v2)
@@ -11,76 +11,123 @@ This script performs a fast, deterministic end-to-end check:
   3) Scores findings against the gold standard for perturbed runs
   4) Verifies clean runs have zero errors
 
+By default findings stay in memory: each project is built, validated and
+scored in one worker without writing gold/findings/report files (the dataset
+and dictionary CSVs are still written, as they are the validator's input).
+`--on-disk` (implied by `--keep`) runs the full file-based seed → dd-val CLI →
+score_corpus pipeline instead.
+
 It exits non-zero if assertions fail, making it CI-friendly.
 """
 
 import argparse
-import json
+import os
 import shutil
 import sys
 import tempfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 # Local imports (no external deps)
-from src.dd_eval.seed import seed_corpus
-from src.dd_eval.score import score_corpus
+from src.dd_eval.seed import build_project, seed_corpus, write_run
+from src.dd_eval.score import score_corpus, score_runs
+from src.dd_eval.util import read_json
 from src.dd_val.cli import main as ddval_main
+from src.dd_val.cli import validate
 
 
-def _run_validator_over(base: Path) -> None:
-    """Run dd-val over every directory that has dictionary.csv + dataset.csv.
+def _catalog(base: Path) -> Dict[Path, Dict[str, Optional[Path]]]:
+    """Walk `base` once and index run directories (those with dictionary.csv).
 
-    Ensures deterministic order so that v1 runs before v2 to enable since-last-run linking.
+    Maps run_dir -> {"dict", "data", "gold", "findings"}; "data"/"gold" are None
+    when absent and "findings" is the validator's output path. Sorted by run_dir.
+    """
+    runs: Dict[Path, Dict[str, Optional[Path]]] = {}
+    for root, _dirs, files in os.walk(base):
+        if "dictionary.csv" not in files:
+            continue
+        run_dir = Path(root)
+        runs[run_dir] = {
+            "dict": run_dir / "dictionary.csv",
+            "data": run_dir / "dataset.csv" if "dataset.csv" in files else None,
+            "gold": run_dir / "gold.json" if "gold.json" in files else None,
+            "findings": run_dir / "findings.json",
+        }
+    return dict(sorted(runs.items()))
+
+
+def _validate_dir(run_dir: Path) -> None:
+    out = run_dir / "findings.json"
+    html = run_dir / "report.html"
+    args = [
+        "--dict",
+        str(run_dir / "dictionary.csv"),
+        "--data",
+        str(run_dir / "dataset.csv"),
+        "--out",
+        str(out),
+        "--html",
+        str(html),
+    ]
+    ddval_main(args)
+
+
+def _validate_group(run_dirs: List[Path]) -> None:
+    for run_dir in run_dirs:
+        _validate_dir(run_dir)
+
+
+def _run_validator_over(catalog: Dict[Path, Dict[str, Optional[Path]]]) -> None:
+    """Run dd-val over every cataloged directory that has a dataset.csv.
+
+    Version folders sharing a parent (e.g. perturbed/v1, perturbed/v2) run in
+    sorted order within one task so v1 precedes v2 for since-last-run linking;
+    independent groups run in parallel worker processes.
     """
-    dict_files = sorted(base.rglob("dictionary.csv"))
-    for dpath in dict_files:
-        run_dir = dpath.parent
-        data = run_dir / "dataset.csv"
-        if not data.exists():
+    groups: Dict[Path, List[Path]] = defaultdict(list)
+    for run_dir, run in catalog.items():
+        if run["data"] is None:
             continue
-        out = run_dir / "findings.json"
-        html = run_dir / "report.html"
-        args = [
-            "--dict",
-            str(dpath),
-            "--data",
-            str(data),
-            "--out",
-            str(out),
-            "--html",
-            str(html),
-        ]
-        ddval_main(args)
-
-
-def _collect_clean_runs_with_errors(base: Path) -> List[Tuple[Path, int]]:
+        groups[run_dir.parent].append(run_dir)
+    with ProcessPoolExecutor() as ex:
+        futures = [ex.submit(_validate_group, run_dirs) for run_dirs in groups.values()]
+        for fut in as_completed(futures):
+            fut.result()  # re-raise the first validator failure
+
+
+def _is_error(f: object) -> bool:
+    return isinstance(f, dict) and f.get("severity") == "error"
+
+
+def _collect_clean_runs_with_errors(catalog: Dict[Path, Dict[str, Optional[Path]]]) -> List[Tuple[Path, int]]:
     """Return list of (run_dir, error_count) for directories without gold.json that have errors."""
     offenders: List[Tuple[Path, int]] = []
-    for dpath in sorted(base.rglob("dictionary.csv")):
-        run_dir = dpath.parent
-        gold = run_dir / "gold.json"
-        if gold.exists():
+    for run_dir, run in catalog.items():
+        if run["gold"] is not None:
             continue  # not a clean run (perturbed run has gold)
-        findings_file = run_dir / "findings.json"
+        findings_file = run["findings"]
         if not findings_file.exists():
             continue
         try:
-            raw = json.loads(findings_file.read_text(encoding="utf-8"))
+            raw = read_json(findings_file)
             findings = raw.get("findings", []) if isinstance(raw, dict) else (raw or [])
         except Exception:
             continue
-        errors = [f for f in findings if isinstance(f, dict) and f.get("severity") == "error"]
-        if errors:
-            offenders.append((run_dir, len(errors)))
+        # Clean runs are the common case: stop at the first error, count only offenders
+        if any(map(_is_error, findings)):
+            offenders.append((run_dir, sum(map(_is_error, findings))))
     return offenders
 
 
-def _gold_types(base: Path) -> List[str]:
+def _gold_types(catalog: Dict[Path, Dict[str, Optional[Path]]]) -> List[str]:
     types: set[str] = set()
-    for g in base.rglob("gold.json"):
+    for run in catalog.values():
+        if run["gold"] is None:
+            continue
         try:
-            gold = json.loads(g.read_text(encoding="utf-8"))
+            gold = read_json(run["gold"])
             for rec in gold:
                 t = (rec or {}).get("type")
                 if t:
@@ -90,27 +137,74 @@ def _gold_types(base: Path) -> List[str]:
     return sorted(types)
 
 
-def run_selftest(projects: int, rows: int, seed: int, keep: bool) -> int:
+def _selftest_project(
+    i: int, rows: int, seed: int, tmp_dir: Path
+) -> Tuple[List[Tuple[Path, int]], List[Tuple[List[dict], List[dict]]]]:
+    """Build, validate and pair up one project's runs in memory.
+
+    Returns (clean runs with errors, [(gold, findings)] for perturbed runs).
+    Each version's findings feed the next version in the same folder as `prev`,
+    matching the CLI's vN -> v(N-1) inference.
+    """
+    offenders: List[Tuple[Path, int]] = []
+    pairs: List[Tuple[List[dict], List[dict]]] = []
+    last: Dict[str, dict] = {}
+    for rel, d_rows, x_rows, gold in build_project(i, rows, seed):
+        run_dir = tmp_dir / f"proj{i:02d}" / rel
+        write_run(run_dir, d_rows, x_rows)
+        group = rel.rsplit("/", 1)[0]
+        result = validate(run_dir / "dictionary.csv", run_dir / "dataset.csv", last.get(group))
+        last[group] = result
+        findings = result["findings"]
+        if gold is None:
+            n_err = sum(map(_is_error, findings))
+            if n_err:
+                offenders.append((run_dir, n_err))
+        else:
+            pairs.append((gold, findings))
+    return offenders, pairs
+
+
+def _run_in_memory(
+    tmp_dir: Path, projects: int, rows: int, seed: int
+) -> Tuple[List[Tuple[Path, int]], Dict[str, Dict[str, float]], List[str]]:
+    offenders: List[Tuple[Path, int]] = []
+    pairs: List[Tuple[List[dict], List[dict]]] = []
+    with ProcessPoolExecutor() as ex:
+        futures = [ex.submit(_selftest_project, i, rows, seed, tmp_dir) for i in range(1, projects + 1)]
+        for fut in futures:
+            proj_offenders, proj_pairs = fut.result()
+            offenders += proj_offenders
+            pairs += proj_pairs
+    present = sorted({t for gold, _ in pairs for rec in gold if (t := (rec or {}).get("type"))})
+    return offenders, score_runs(pairs, mode="variable"), present
+
+
+def _run_on_disk(
+    tmp_dir: Path, projects: int, rows: int, seed: int
+) -> Tuple[List[Tuple[Path, int]], Dict[str, Dict[str, float]], List[str]]:
+    seed_corpus(tmp_dir, n_projects=projects, rows_per_project=rows, seed=seed)
+    # Index run directories once for all phases below
+    catalog = _catalog(tmp_dir)
+    _run_validator_over(catalog)
+    offenders = _collect_clean_runs_with_errors(catalog)
+    if offenders:
+        return offenders, {}, []
+    return offenders, score_corpus(tmp_dir, mode="variable"), _gold_types(catalog)
+
+
+def run_selftest(projects: int, rows: int, seed: int, keep: bool, on_disk: bool = False) -> int:
     tmp_dir = Path(tempfile.mkdtemp(prefix="ddval-selftest-"))
     try:
-        # 1) Seed a tiny corpus
-        seed_corpus(tmp_dir, n_projects=projects, rows_per_project=rows, seed=seed)
-
-        # 2) Run the validator across the corpus
-        _run_validator_over(tmp_dir)
-
-        # 3) Check clean runs for zero errors
-        offenders = _collect_clean_runs_with_errors(tmp_dir)
+        # 1-3) Seed, validate, and collect clean runs with errors; 4) score perturbed runs against gold
+        run = _run_on_disk if (on_disk or keep) else _run_in_memory
+        offenders, metrics, present = run(tmp_dir, projects, rows, seed)
         if offenders:
             print("Clean runs produced errors:", file=sys.stderr)
             for d, n in offenders:
                 print(f"  - {d} errors={n}", file=sys.stderr)
             return 2
 
-        # 4) Score perturbed runs against gold
-        metrics: Dict[str, Dict[str, float]] = score_corpus(tmp_dir, mode="variable")
-        present = _gold_types(tmp_dir)
-
         # Enforce a simple bar for all types present in gold
         FAIL_THRESHOLD = 0.90  # per-type F1 minimum
         failing: List[Tuple[str, float]] = []
@@ -147,10 +241,11 @@ def main(argv: List[str] | None = None) -> None:
     ap.add_argument("--projects", type=int, default=3, help="Projects to seed (default: 3)")
     ap.add_argument("--rows", type=int, default=200, help="Rows per project (default: 200)")
     ap.add_argument("--seed", type=int, default=42, help="RNG seed (default: 42)")
-    ap.add_argument("--keep", action="store_true", help="Keep the temporary corpus directory (for debugging)")
+    ap.add_argument("--keep", action="store_true", help="Keep the temporary corpus directory (for debugging; implies --on-disk)")
+    ap.add_argument("--on-disk", action="store_true", help="Run the file-based seed/CLI/score pipeline instead of the in-memory path")
     args = ap.parse_args(argv)
 
-    code = run_selftest(args.projects, args.rows, args.seed, args.keep)
+    code = run_selftest(args.projects, args.rows, args.seed, args.keep, args.on_disk)
     sys.exit(code)
 
 
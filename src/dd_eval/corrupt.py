@@ -2,14 +2,13 @@ from __future__ import annotations
 
 """Deterministic corruption recipes to generate perturbed datasets.
 
-NOTE: Some branches currently use `random.random()` instead of the provided RNG,
-which introduces minor non-determinism across runs. We keep the behavior for
-backward compatibility. Consider switching to the provided `rng` everywhere
-in a future revision when you are ready to reseed the corpus.
+All randomness comes from the per-call `rng`, so output depends only on the
+inputs and `seed`.
 """
 
-import copy
+import math
 import random
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
 from .synth import dataset_headers
@@ -17,6 +16,11 @@ from .synth import dataset_headers
 
 Issue = Dict[str, object]
 
+_NUMERIC_VALIDATIONS = frozenset({"integer", "number"})
+_LABEL_TYPES = frozenset({"radio", "dropdown", "yesno", "truefalse"})
+_DOMAIN_TYPES = frozenset({"radio", "dropdown"})
+_BOOL_TYPES = frozenset({"yesno", "truefalse"})
+
 
 def _log(gold: List[Issue], type_: str, variable: str, **kwargs) -> None:
     rec: Issue = {"type": type_, "variable": variable}
@@ -28,8 +32,30 @@ def _dict_by_var(rows: List[Dict[str, str]]) -> Dict[str, Dict[str, str]]:
     return {r["variable_name"]: r for r in rows}
 
 
-def _choice_pairs(r: Dict[str, str]) -> List[Tuple[str, str]]:
-    raw = r.get("choices_calculations_or_slider_labels", "").strip()
+def _sample_rows(rng: random.Random, n: int, p: float) -> List[int]:
+    """Indices in range(n), each selected independently with probability p.
+
+    Draws the whole selection up front so recipes only visit affected rows.
+    For sparse rates the gaps between hits are drawn from a geometric
+    distribution (one draw per hit instead of one per row).
+    """
+    draw = rng.random
+    if p >= 0.5:  # dense: a draw per row is cheaper than the log math
+        return [i for i in range(n) if draw() < p]
+    if p <= 0.0:
+        return []
+    log_q = math.log(1.0 - p)
+    out: List[int] = []
+    i = -1
+    while True:
+        i += int(math.log(1.0 - draw()) / log_q) + 1
+        if i >= n:
+            return out
+        out.append(i)
+
+
+@lru_cache(maxsize=None)
+def _parse_choices(raw: str) -> Tuple[Tuple[str, str], ...]:
     pairs: List[Tuple[str, str]] = []
     for part in raw.split("|") if raw else []:
         part = part.strip()
@@ -38,7 +64,11 @@ def _choice_pairs(r: Dict[str, str]) -> List[Tuple[str, str]]:
         if "," in part:
             v, lbl = part.split(",", 1)
             pairs.append((v.strip(), lbl.strip()))
-    return pairs
+    return tuple(pairs)
+
+
+def _choice_pairs(r: Dict[str, str]) -> List[Tuple[str, str]]:
+    return list(_parse_choices(r.get("choices_calculations_or_slider_labels", "").strip()))
 
 
 def apply_corruptions(
@@ -52,58 +82,72 @@ def apply_corruptions(
     enable = enable or {}
     enable_default = True
 
-    d_rows = copy.deepcopy(dict_rows)
-    x_rows = copy.deepcopy(data_rows)
+    # Rows are flat str->str dicts: a per-row dict copy isolates the caller's data
+    d_rows = [dict(r) for r in dict_rows]
+    x_rows = [dict(r) for r in data_rows]
     gold: List[Issue] = []
 
     by_var = _dict_by_var(d_rows)
-    data_cols = list(x_rows[0].keys()) if x_rows else []
+    # Current dataset columns; kept in sync as recipes add, drop, or rename columns
+    cols = set(x_rows[0].keys()) if x_rows else set()
+
+    # Classify dictionary variables once (dictionary order is preserved)
+    numeric_vars: List[str] = []
+    date_vars: List[str] = []
+    domain_vars: List[str] = []
+    label_vars: List[str] = []
+    required_vars: List[str] = []
+    for v, r in by_var.items():
+        validation = r.get("text_validation_type_or_show_slider_number")
+        ft = r.get("field_type")
+        if validation in _NUMERIC_VALIDATIONS:
+            numeric_vars.append(v)
+        elif validation == "date_ymd":
+            date_vars.append(v)
+        if ft in _LABEL_TYPES:
+            label_vars.append(v)
+            if ft in _DOMAIN_TYPES:
+                domain_vars.append(v)
+        if r.get("required_field", "").lower() == "y":
+            required_vars.append(v)
 
     # 1) Missing/extra columns
-    if enable.get("missing_extra_columns", enable_default) and data_cols:
-        candidates = [v for v in by_var.keys() if v not in {"record_id"} and v in data_cols]
+    if enable.get("missing_extra_columns", enable_default) and cols:
+        candidates = [v for v in by_var.keys() if v != "record_id" and v in cols]
         if candidates:
             drop_v = rng.choice(candidates)
             for row in x_rows:
                 if drop_v in row:
                     row.pop(drop_v)
+            cols.discard(drop_v)
             _log(gold, "missing_column_in_data", drop_v, rows_affected=len(x_rows))
         # Add extra data-only column
         extra_name = "extra_col"
-        if extra_name not in data_cols:
+        if extra_name not in cols:
             for row in x_rows:
                 row[extra_name] = str(rng.randrange(0, 9999))
+            cols.add(extra_name)
             _log(gold, "extra_column_in_data", extra_name, rows_affected=len(x_rows))
 
     # 2) Type drift (integers to strings; date format changes)
     if enable.get("type_drift", enable_default):
         # Numeric fields
-        numeric_vars = [
-            v
-            for v, r in by_var.items()
-            if r.get("text_validation_type_or_show_slider_number") in {"integer", "number"}
-            and v in x_rows[0]
-        ]
-        for v in numeric_vars:
+        for v in [v for v in numeric_vars if v in cols]:
             n_aff = 0
-            for row in x_rows:
-                if rng.random() < 0.15 and row.get(v, "") != "":
+            for i in _sample_rows(rng, len(x_rows), 0.15):
+                row = x_rows[i]
+                if row.get(v, "") != "":
                     row[v] = row[v] + "x"  # make non-coercible
                     n_aff += 1
             if n_aff:
                 _log(gold, "type_mismatch", v, expected="numeric", observed="string", rows_affected=n_aff)
         # Date fields
-        date_vars = [
-            v
-            for v, r in by_var.items()
-            if r.get("text_validation_type_or_show_slider_number") in {"date_ymd"}
-            and v in x_rows[0]
-        ]
-        for v in date_vars:
+        for v in [v for v in date_vars if v in cols]:
             n_aff = 0
-            for row in x_rows:
+            for i in _sample_rows(rng, len(x_rows), 0.2):
+                row = x_rows[i]
                 val = row.get(v, "")
-                if val and rng.random() < 0.2:
+                if val:
                     # y-m-d -> m/d/Y
                     y, m, d = val.split("-")
                     row[v] = f"{m}/{d}/{y}"
@@ -113,17 +157,16 @@ def apply_corruptions(
 
     # 3) Domain drift for categoricals (skip if label-export mode is enabled to avoid conflict)
     if enable.get("domain_drift", enable_default) and not enable.get("label_export", enable_default):
-        cat_vars = [v for v, r in by_var.items() if r.get("field_type") in {"radio", "dropdown"} and v in x_rows[0]]
+        cat_vars = [v for v in domain_vars if v in cols]
         if cat_vars:
             v = rng.choice(cat_vars)
             seen = set([row.get(v, "") for row in x_rows if row.get(v, "") != ""])
             # Inject unseen level
             injected = "9"
             affected = 0
-            for row in x_rows:
-                if rng.random() < 0.1:
-                    row[v] = injected
-                    affected += 1
+            for i in _sample_rows(rng, len(x_rows), 0.1):
+                x_rows[i][v] = injected
+                affected += 1
             expected = [f"{code}={lbl}" for code, lbl in _choice_pairs(by_var[v])]
             observed = sorted(list({*seen, injected}))
             if affected:
@@ -137,11 +180,12 @@ def apply_corruptions(
                 )
 
     # 4) Unit anomalies (height cm -> inches subset)
-    if enable.get("unit_anomalies", enable_default) and "height_cm" in x_rows[0]:
+    if enable.get("unit_anomalies", enable_default) and "height_cm" in cols:
         affected = 0
-        for row in x_rows:
+        for i in _sample_rows(rng, len(x_rows), 0.12):
+            row = x_rows[i]
             val = row.get("height_cm", "")
-            if val and "x" not in val and random.random() < 0.12:
+            if val and "x" not in val:
                 try:
                     cm = float(val)
                     inches = cm * 0.393701
@@ -153,28 +197,30 @@ def apply_corruptions(
             _log(gold, "unit_anomaly", "height_cm", expected_unit="cm", note="subset appears inches", rows_affected=affected)
 
     # 5) Missingness spikes (visit 2 fields)
-    if enable.get("missingness_spikes", enable_default) and "visit_date_v2" in x_rows[0]:
+    if enable.get("missingness_spikes", enable_default) and "visit_date_v2" in cols:
         affected = 0
-        for row in x_rows:
-            if random.random() < 0.8:
-                if row.get("visit_date_v2"):
-                    row["visit_date_v2"] = ""
-                    affected += 1
+        for i in _sample_rows(rng, len(x_rows), 0.8):
+            row = x_rows[i]
+            if row.get("visit_date_v2"):
+                row["visit_date_v2"] = ""
+                affected += 1
         if affected:
             _log(gold, "missingness_spike", "visit_date_v2", rows_affected=affected)
 
     # 6) Rename drift (bp_sys -> sbp or height_cm -> ht_cm)
     if enable.get("rename_drift", enable_default):
         target = None
-        if "bp_sys" in x_rows[0]:
+        if "bp_sys" in cols:
             target = ("bp_sys", "sbp")
-        elif "height_cm" in x_rows[0]:
+        elif "height_cm" in cols:
             target = ("height_cm", "ht_cm")
         if target:
             old, new = target
             for row in x_rows:
                 if old in row:
                     row[new] = row.pop(old)
+            cols.discard(old)
+            cols.add(new)
             _log(gold, "rename_drift", old, observed=new, rows_affected=len(x_rows))
 
     # 7) Checkbox expansion mismatch (add extra code column or drop one)
@@ -186,15 +232,18 @@ def apply_corruptions(
         if codes:
             # Add a bogus column symptoms___999
             bogus = "symptoms___999"
-            for row in x_rows:
-                row[bogus] = "1" if random.random() < 0.05 else "0"
+            hits = set(_sample_rows(rng, len(x_rows), 0.05))
+            for i, row in enumerate(x_rows):
+                row[bogus] = "1" if i in hits else "0"
+            cols.add(bogus)
             _log(gold, "checkbox_expansion_mismatch", "symptoms", observed_added=[bogus], rows_affected=len(x_rows))
 
     # 8) Branching mismatch (pregnant with sex=Male)
-    if enable.get("branching_mismatch", enable_default) and "sex" in x_rows[0] and "pregnant" in x_rows[0]:
+    if enable.get("branching_mismatch", enable_default) and "sex" in cols and "pregnant" in cols:
         affected = 0
-        for row in x_rows:
-            if row.get("sex") == "0" and random.random() < 0.2:
+        for i in _sample_rows(rng, len(x_rows), 0.2):
+            row = x_rows[i]
+            if row.get("sex") == "0":
                 row["pregnant"] = "1"
                 affected += 1
         if affected:
@@ -205,27 +254,28 @@ def apply_corruptions(
         # Move one ADL row to the end
         idxs = [i for i, r in enumerate(d_rows) if r.get("matrix_group_name") == "adls"]
         if len(idxs) >= 2:
-            i = random.choice(idxs)
+            i = rng.choice(idxs)
             d_rows.append(d_rows.pop(i))
             _log(gold, "matrix_nonconsecutive", "adls", rows_affected=0)
 
     # 10) Primary key integrity issues
     if enable.get("primary_key", enable_default):
         # Prefer record_id if present
-        pk = "record_id" if "record_id" in (x_rows[0] if x_rows else {}) else None
+        pk = "record_id" if "record_id" in cols else None
         if pk:
             mode = rng.choice(["duplicates", "missing_column"]) if len(x_rows) > 0 else "duplicates"
             if mode == "missing_column":
                 for row in x_rows:
                     if pk in row:
                         row.pop(pk)
+                cols.discard(pk)
                 _log(gold, "missing_primary_key_column", pk, rows_affected=len(x_rows))
             else:
                 # Create duplicates by copying some earlier IDs into later rows
                 ids = [row.get(pk, "") for row in x_rows]
                 n_aff = 0
-                for i in range(len(x_rows)):
-                    if ids[i] and rng.random() < 0.1:
+                for i in _sample_rows(rng, len(x_rows), 0.1):
+                    if ids[i]:
                         j = rng.randrange(0, max(1, i))
                         if ids[j]:
                             x_rows[i][pk] = ids[j]
@@ -236,35 +286,35 @@ def apply_corruptions(
     # 11) Required field missing rate (high)
     if enable.get("required_missing", enable_default):
         # Pick from known required fields in our synth dict (e.g., 'age' or 'sex')
-        candidates = [v for v, r in by_var.items() if r.get("required_field", "").lower() == "y" and v in (x_rows[0] if x_rows else {})]
+        candidates = [v for v in required_vars if v in cols]
         if candidates:
             v = rng.choice(candidates)
             affected = 0
-            for row in x_rows:
-                if rng.random() < 0.3:  # 30% missing
-                    row[v] = ""
-                    affected += 1
+            for i in _sample_rows(rng, len(x_rows), 0.3):  # 30% missing
+                x_rows[i][v] = ""
+                affected += 1
             if affected:
                 _log(gold, "required_field_missing_rate_high", v, rows_affected=affected)
 
     # 12) Label vs raw export (convert categorical codes to labels)
     if enable.get("label_export", enable_default):
         # Build mapping var: {code->label}
-        cat_vars = [v for v, r in by_var.items() if r.get("field_type") in {"radio", "dropdown", "yesno", "truefalse"} and v in (x_rows[0] if x_rows else {})]
+        cat_vars = [v for v in label_vars if v in cols]
         if cat_vars:
             maps = {}
             for v in cat_vars:
                 pairs = _choice_pairs(by_var[v])
-                if not pairs and by_var[v].get("field_type") in {"yesno", "truefalse"}:
+                if not pairs and by_var[v].get("field_type") in _BOOL_TYPES:
                     pairs = [("0", "No"), ("1", "Yes")] if by_var[v]["field_type"] == "yesno" else [("0", "False"), ("1", "True")]
                 maps[v] = {c: lbl for c, lbl in pairs}
-            # Convert values where mapping exists
+            # Convert values where mapping exists: one bound lookup per cell
+            getters = [(v, maps[v].get) for v in cat_vars if maps[v]]
             converted = 0
             for row in x_rows:
-                for v in cat_vars:
-                    val = row.get(v, "")
-                    if val in maps.get(v, {}):
-                        row[v] = maps[v][val]
+                for v, label_of in getters:
+                    lbl = label_of(row.get(v, ""))
+                    if lbl is not None:
+                        row[v] = lbl
                         converted += 1
             if converted:
                 _log(gold, "export_mode_labels_detected", "dataset", rows_affected=len(x_rows))
@@ -289,8 +339,8 @@ def apply_since_last_run(
     dict_rows: List[Dict[str, str]], data_rows: List[Dict[str, str]], seed: int
 ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], List[Issue]]:
     rng = random.Random(seed + 1)
-    d2 = copy.deepcopy(dict_rows)
-    x2 = copy.deepcopy(data_rows)
+    d2 = [dict(r) for r in dict_rows]
+    x2 = [dict(r) for r in data_rows]
     gold: List[Issue] = []
 
     by_var = _dict_by_var(d2)
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List
+from typing import Dict, FrozenSet, Iterable, Tuple
 
 
 # REDCap Data Dictionary headers (A–R)
-HEADERS: List[str] = [
+HEADERS: Tuple[str, ...] = (
     "variable_name",
     "form_name",
     "section_header",
@@ -23,10 +23,10 @@ HEADERS: List[str] = [
     "matrix_group_name",
     "matrix_ranking",
     "field_annotation",
-]
+)
 
 
-FIELD_TYPES = {
+FIELD_TYPES: FrozenSet[str] = frozenset({
     "text",
     "notes",
     "radio",
@@ -36,10 +36,10 @@ FIELD_TYPES = {
     "truefalse",
     "calc",
     "slider",
-}
+})
 
 
-TEXT_VALIDATIONS = {
+TEXT_VALIDATIONS: FrozenSet[str] = frozenset({
     "integer",
     "number",
     "date_ymd",
@@ -48,11 +48,11 @@ TEXT_VALIDATIONS = {
     "email",
     "phone",
     "zipcode",
-}
+})
 
 
 def empty_row() -> Dict[str, str]:
-    return {h: "" for h in HEADERS}
+    return dict.fromkeys(HEADERS, "")
 
 
 def normalize_row(row: Dict[str, str]) -> Dict[str, str]:
@@ -64,5 +64,4 @@ def normalize_row(row: Dict[str, str]) -> Dict[str, str]:
 
 
 def ensure_headers(columns: Iterable[str]) -> bool:
-    cols = list(columns)
-    return cols == HEADERS
+    return tuple(columns) == HEADERS
@@ -2,54 +2,94 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Set, Tuple
 
+from .util import read_json
 
-def _load_gold_and_findings(run_dir: Path) -> Tuple[List[dict], List[dict]]:
-    gold_path = run_dir / "gold.json"
-    findings_path = run_dir / "findings.json"
-    gold = json.loads(gold_path.read_text(encoding="utf-8")) if gold_path.exists() else []
-    findings_raw = json.loads(findings_path.read_text(encoding="utf-8")) if findings_path.exists() else []
-    if isinstance(findings_raw, dict):
-        findings = findings_raw.get("findings", [])
-    else:
-        findings = findings_raw
-    return gold, findings
 
+def _iter_issues(path: Path) -> Iterator[dict]:
+    """Yield issue records from a gold/findings file (list or {"findings": [...]}).
 
-def _key(issue: dict, mode: str = "variable") -> Tuple[str, str]:
-    t = issue.get("type", "")
-    if mode == "strict":
-        v = issue.get("variable", "")
-        e = json.dumps(issue.get("expected"), sort_keys=True) if "expected" in issue else ""
-        o = json.dumps(issue.get("observed"), sort_keys=True) if "observed" in issue else ""
-        return (t, f"{v}|{e}|{o}")
-    else:
-        return (t, issue.get("variable", ""))
+    The whole file is loaded with `read_json`; callers reduce records to keys
+    as they go so only the keys outlive the parsed document.
+    """
+    if not path.exists():
+        return
+    raw = read_json(path)
+    if isinstance(raw, dict):
+        raw = raw.get("findings", [])
+    yield from raw
 
 
-def score_corpus(corpus_dir: str | Path, mode: str = "variable") -> Dict[str, Dict[str, float]]:
-    base = Path(corpus_dir)
-    # Discover all run dirs that contain a gold.json (layout-agnostic)
-    runs = sorted(p.parent for p in base.rglob("gold.json"))
+def _canon(x: Any) -> Hashable:
+    """Hashable structural form of a JSON value, equal iff the sorted-key JSON is.
+
+    Dicts/lists become tagged tuples; bools and floats are tagged so True/1/1.0
+    stay distinct as they are in JSON.
+    """
+    if isinstance(x, dict):
+        return (dict, tuple(sorted((k, _canon(v)) for k, v in x.items())))
+    if isinstance(x, (list, tuple)):
+        return (list, tuple(map(_canon, x)))
+    if isinstance(x, (bool, float)):
+        return (type(x), x)
+    return x
+
+
+_ABSENT = ("<absent>",)
+
+
+def _strict_key(issue: dict) -> Tuple[str, Hashable]:
+    e = _canon(issue["expected"]) if "expected" in issue else _ABSENT
+    o = _canon(issue["observed"]) if "observed" in issue else _ABSENT
+    return (issue.get("type", ""), (issue.get("variable", ""), e, o))
+
+
+def _variable_key(issue: dict) -> Tuple[str, Hashable]:
+    return (issue.get("type", ""), issue.get("variable", ""))
+
+
+def _score_issues(gold: Iterable[dict], findings: Iterable[dict], mode: str) -> Dict[str, Tuple[int, int, int]]:
+    """Per-type (tp, fp, fn) for one run's gold and predicted issues.
+
+    Each issue is keyed exactly once, as it is read; only the keys are kept.
+    """
+    key = _strict_key if mode == "strict" else _variable_key
+    gold_by_t: Dict[str, Set[Hashable]] = defaultdict(set)
+    pred_by_t: Dict[str, Set[Hashable]] = defaultdict(set)
+    for g in gold:
+        t, k = key(g)
+        gold_by_t[t].add(k)
+    for f in findings:
+        t, k = key(f)
+        pred_by_t[t].add(k)
+
+    counts: Dict[str, Tuple[int, int, int]] = {}
+    for t in gold_by_t.keys() | pred_by_t.keys():
+        gset, pset = gold_by_t[t], pred_by_t[t]
+        counts[t] = (len(gset & pset), len(pset - gset), len(gset - pset))
+    return counts
+
+
+def _score_one(run: Path, mode: str) -> Dict[str, Tuple[int, int, int]]:
+    """Per-type (tp, fp, fn) for a single run directory."""
+    return _score_issues(_iter_issues(run / "gold.json"), _iter_issues(run / "findings.json"), mode)
+
+
+def _metrics(per_run: Iterable[Dict[str, Tuple[int, int, int]]]) -> Dict[str, Dict[str, float]]:
+    """Merge per-run counts and compute per-type precision/recall/F1."""
     tp: Dict[str, int] = defaultdict(int)
     fp: Dict[str, int] = defaultdict(int)
     fn: Dict[str, int] = defaultdict(int)
-
-    for run in runs:
-        gold, findings = _load_gold_and_findings(run)
-        gold_keys = {(t, k) for (t, k) in (_key(g, mode) for g in gold)}
-        pred_keys = {(t, k) for (t, k) in (_key(f, mode) for f in findings)}
-
-        types = {t for (t, _k) in gold_keys | pred_keys}
-        for t in types:
-            gset = {k for (tt, k) in gold_keys if tt == t}
-            pset = {k for (tt, k) in pred_keys if tt == t}
-            tp[t] += len(gset & pset)
-            fp[t] += len(pset - gset)
-            fn[t] += len(gset - pset)
+    for counts in per_run:
+        for t, (n_tp, n_fp, n_fn) in counts.items():
+            tp[t] += n_tp
+            fp[t] += n_fp
+            fn[t] += n_fn
 
     metrics: Dict[str, Dict[str, float]] = {}
     for t in sorted({*tp.keys(), *fp.keys(), *fn.keys()}):
@@ -60,6 +100,23 @@ def score_corpus(corpus_dir: str | Path, mode: str = "variable") -> Dict[str, Di
     return metrics
 
 
+def score_runs(
+    runs: Iterable[Tuple[List[dict], List[dict]]], mode: str = "variable"
+) -> Dict[str, Dict[str, float]]:
+    """Score in-memory (gold, findings) pairs, one per run; same metrics as `score_corpus`."""
+    return _metrics(_score_issues(gold, findings, mode) for gold, findings in runs)
+
+
+def score_corpus(corpus_dir: str | Path, mode: str = "variable") -> Dict[str, Dict[str, float]]:
+    base = Path(corpus_dir)
+    # Discover all run dirs that contain a gold.json (layout-agnostic)
+    runs = sorted(p.parent for p in base.rglob("gold.json"))
+
+    # Runs are independent and mostly file reads; score them concurrently and merge
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as ex:
+        return _metrics(ex.map(lambda run: _score_one(run, mode), runs))
+
+
 def main(argv: List[str] | None = None) -> None:
     ap = argparse.ArgumentParser(description="Score findings.json against gold.json across corpus")
     ap.add_argument("--corpus", default="corpus", help="Corpus directory (default: corpus)")
@@ -7,8 +7,9 @@ Writes a nested, versioned layout under `corpus/<project>/...`.
 
 import argparse
 import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 
 from .corrupt import apply_corruptions, apply_since_last_run
 from .schema import HEADERS
@@ -16,45 +17,90 @@ from .synth import dictionary_and_data
 from .util import ensure_dir, write_csv, write_json
 
 
+def build_project(i: int, rows_per_project: int, seed: int) -> List[Tuple[str, List[dict], List[dict], List[dict] | None]]:
+    """Build project `i` in memory as (run path, dictionary rows, data rows, gold).
+
+    Runs are clean/v1, perturbed/v1 and perturbed/v2 (since-last-run), in that
+    order; gold is None for the clean run.
+    """
+    d_rows, x_rows = dictionary_and_data(i, rows_per_project, seed)
+    p_rows, p_data, gold1 = apply_corruptions(d_rows, x_rows, seed + i)
+    p2_rows, p2_data, gold2_extra = apply_since_last_run(p_rows, p_data, seed + i)
+    return [
+        ("clean/v1", d_rows, x_rows, None),
+        ("perturbed/v1", p_rows, p_data, gold1),
+        ("perturbed/v2", p2_rows, p2_data, gold1 + gold2_extra),
+    ]
+
+
+def write_run(
+    run_dir: Path,
+    d_rows: List[dict],
+    x_rows: List[dict],
+    gold: List[dict] | None = None,
+    pool: Executor | None = None,
+) -> List[Future]:
+    """Write one run's dictionary.csv, dataset.csv and (if given) gold.json.
+
+    With `pool`, the file writes are submitted to it and their futures returned
+    for the caller to wait on; otherwise they run inline.
+    """
+    ensure_dir(run_dir)
+    data_headers = list(x_rows[0].keys()) if x_rows else []
+    jobs: List[tuple] = [
+        (write_csv, run_dir / "dictionary.csv", d_rows, HEADERS),
+        (write_csv, run_dir / "dataset.csv", x_rows, data_headers),
+    ]
+    if gold is not None:
+        jobs.append((write_json, run_dir / "gold.json", gold))
+    if pool is None:
+        for fn, *args in jobs:
+            fn(*args)
+        return []
+    return [pool.submit(fn, *args) for fn, *args in jobs]
+
+
+def _seed_one_project(i: int, out: Path, rows_per_project: int, seed: int) -> None:
+    """Build and write clean v1 plus perturbed v1/v2 for project `i`."""
+    proj_root = out / f"proj{i:02d}"
+    # Overlap the project's file writes on a couple of threads (within this worker process)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures: List[Future] = []
+        for rel, d_rows, x_rows, gold in build_project(i, rows_per_project, seed):
+            futures += write_run(proj_root / rel, d_rows, x_rows, gold, pool)
+        for fut in futures:
+            fut.result()  # surface write errors
+
+
 def seed_corpus(
     out_dir: os.PathLike[str] | str,
     n_projects: int = 10,
     rows_per_project: int = 500,
     seed: int = 42,
+    workers: int | None = None,
 ) -> None:
+    """Seed `n_projects` projects under `out_dir`.
+
+    Projects are independent (own directory, RNG seeded by `seed + i`), so they
+    are built in a process pool. `workers=1` builds them in-process.
+    """
     out = Path(out_dir)
     ensure_dir(out)
 
-    for i in range(1, n_projects + 1):
-        proj = f"proj{i:02d}"
-        proj_root = out / proj
-        print(f"[seed] Building {proj}…")
-        d_rows, x_rows = dictionary_and_data(i, rows_per_project, seed)
-
-        # Clean v1
-        clean_v1 = proj_root / "clean" / "v1"
-        ensure_dir(clean_v1)
-        write_csv(clean_v1 / "dictionary.csv", d_rows, HEADERS)
-        data_headers = list(x_rows[0].keys()) if x_rows else []
-        write_csv(clean_v1 / "dataset.csv", x_rows, data_headers)
-
-        # Perturbed v1
-        p_rows, p_data, gold1 = apply_corruptions(d_rows, x_rows, seed + i)
-        pert_v1 = proj_root / "perturbed" / "v1"
-        ensure_dir(pert_v1)
-        p_headers = list(p_data[0].keys()) if p_data else []
-        write_csv(pert_v1 / "dictionary.csv", p_rows, HEADERS)
-        write_csv(pert_v1 / "dataset.csv", p_data, p_headers)
-        write_json(pert_v1 / "gold.json", gold1)
-
-        # Perturbed v2 (since-last-run)
-        p2_rows, p2_data, gold2_extra = apply_since_last_run(p_rows, p_data, seed + i)
-        pert_v2 = proj_root / "perturbed" / "v2"
-        ensure_dir(pert_v2)
-        p2_headers = list(p2_data[0].keys()) if p2_data else []
-        write_csv(pert_v2 / "dictionary.csv", p2_rows, HEADERS)
-        write_csv(pert_v2 / "dataset.csv", p2_data, p2_headers)
-        write_json(pert_v2 / "gold.json", gold1 + gold2_extra)
+    indices = range(1, n_projects + 1)
+    if workers == 1 or n_projects <= 1:
+        for i in indices:
+            print(f"[seed] Building proj{i:02d}…")
+            _seed_one_project(i, out, rows_per_project, seed)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as ex:
+        futures = {}
+        for i in indices:
+            print(f"[seed] Building proj{i:02d}…")
+            futures[ex.submit(_seed_one_project, i, out, rows_per_project, seed)] = i
+        for fut in as_completed(futures):
+            fut.result()  # surface worker exceptions
 
 
 def build_argparser() -> argparse.ArgumentParser:
@@ -63,12 +109,13 @@ def build_argparser() -> argparse.ArgumentParser:
     p.add_argument("--projects", type=int, default=10, help="Number of projects (default: 10)")
     p.add_argument("--rows", type=int, default=500, help="Rows per project (default: 500)")
     p.add_argument("--seed", type=int, default=42, help="RNG seed (default: 42)")
+    p.add_argument("--workers", type=int, default=None, help="Parallel worker processes (default: CPU count)")
     return p
 
 
 def main(argv: List[str] | None = None) -> None:
     args = build_argparser().parse_args(argv)
-    seed_corpus(args.out, args.projects, args.rows, args.seed)
+    seed_corpus(args.out, args.projects, args.rows, args.seed, args.workers)
 
 
 if __name__ == "__main__":
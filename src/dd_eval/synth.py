@@ -3,17 +3,23 @@ from __future__ import annotations
 """Synthesize small, realistic REDCap dictionaries and conforming datasets."""
 
 import random
+import sys
 from datetime import date, timedelta
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
 from .schema import HEADERS, empty_row, normalize_row
 from .util import rnd_choice
 
 
+_EMPTY_TEMPLATE: Dict[str, str] = empty_row()
+_CHOICE_TYPES = frozenset({"radio", "dropdown", "checkbox", "yesno", "truefalse"})
+_BOOL_TYPES = frozenset({"yesno", "truefalse"})
+
+
 def _dd_row(**kwargs) -> Dict[str, str]:
-    row = empty_row()
-    for k, v in kwargs.items():
-        row[k] = v
+    row = _EMPTY_TEMPLATE.copy()
+    row.update(kwargs)
     return row
 
 
@@ -256,10 +262,10 @@ def generate_dataset(dict_rows: List[Dict[str, str]], n: int, rng: random.Random
     choices = {}
     for r in dict_rows:
         ft = r["field_type"]
-        if ft in {"radio", "dropdown", "checkbox", "yesno", "truefalse"}:
+        if ft in _CHOICE_TYPES:
             raw = r["choices_calculations_or_slider_labels"].strip()
             pairs: List[Tuple[str, str]] = []
-            if ft in {"yesno", "truefalse"}:
+            if ft in _BOOL_TYPES:
                 # REDCap built-ins
                 pairs = [("0", "No"), ("1", "Yes")] if ft == "yesno" else [("0", "False"), ("1", "True")]
             else:
@@ -277,79 +283,105 @@ def generate_dataset(dict_rows: List[Dict[str, str]], n: int, rng: random.Random
     for r in dict_rows:
         v = r["variable_name"]
         ft = r["field_type"]
+        # Interned so every row dict shares one key object per column
         if ft == "checkbox":
             for code, _ in choices.get(v, []):
-                data_cols.append(f"{v}___{code}")
+                data_cols.append(sys.intern(f"{v}___{code}"))
         else:
-            data_cols.append(v)
+            data_cols.append(sys.intern(v))
+
+    # Generate rows. Column presence is resolved once up front; the per-row body
+    # only draws values (in a fixed order, so output is stable for a given seed).
+    present = set(data_cols)
+    has_record_id = "record_id" in present
+    has_sex_type = "sex" in types
+    has_sex = "sex" in present
+    has_age = "age" in present
+    has_height = "height_cm" in present
+    has_weight = "weight_kg" in present
+    has_bmi = "bmi" in present
+    symptom_cols = (
+        [f"symptoms___{code}" for code, _lbl in choices.get("symptoms", [])]
+        if any(c.startswith("symptoms___") for c in data_cols)
+        else []
+    )
+    has_pregnant = "pregnant" in present
+    has_v1 = "visit_date_v1" in present
+    has_v2 = "visit_date_v2" in present
+    has_satisfaction = "satisfaction" in present
+    has_bp_sys = "bp_sys" in present
+    has_bp_dia = "bp_dia" in present
+    has_notes = "notes" in present
+    has_pain = "pain_severity" in present
+    adl_cols = [v for v in ("adls_wash", "adls_dress", "adls_eat") if v in present]
+    template: Dict[str, str] = dict.fromkeys(data_cols, "")
 
-    # Generate rows
     rows: List[Dict[str, str]] = []
     for i in range(n):
-        row: Dict[str, str] = {c: "" for c in data_cols}
-        # record_id
-        if "record_id" in data_cols:
+        row = template.copy()
+        if has_record_id:
             row["record_id"] = str(1000 + i)
-        # sex
-        sex_val = rnd_choice(rng, ["0", "1"]) if "sex" in types else ""
-        if "sex" in data_cols:
+        sex_val = rnd_choice(rng, ["0", "1"]) if has_sex_type else ""
+        if has_sex:
             row["sex"] = sex_val
-        # age
-        if "age" in data_cols:
+        if has_age:
             row["age"] = str(rng.randrange(18, 90))
         # height/weight
-        has_height = "height_cm" in data_cols
-        has_weight = "weight_kg" in data_cols
         h_cm = rng.uniform(150, 190) if has_height else None
         w_kg = rng.uniform(50, 100) if has_weight else None
         if has_height:
             row["height_cm"] = f"{h_cm:.1f}"
         if has_weight:
             row["weight_kg"] = f"{w_kg:.1f}"
-        # bmi
-        if "bmi" in data_cols and h_cm and w_kg:
+        if has_bmi and h_cm and w_kg:
             bmi = w_kg / ((h_cm / 100) ** 2)
             row["bmi"] = f"{bmi:.1f}"
         # checkbox symptoms
-        if any(c.startswith("symptoms___") for c in data_cols):
-            for code, _lbl in choices.get("symptoms", []):
-                row[f"symptoms___{code}"] = "1" if rng.random() < 0.3 else "0"
+        for col in symptom_cols:
+            row[col] = "1" if rng.random() < 0.3 else "0"
         # pregnant depends on sex
-        if "pregnant" in data_cols:
+        if has_pregnant:
             row["pregnant"] = ("1" if sex_val == "1" and rng.random() < 0.1 else "0") if sex_val else ""
         # dates
-        if "visit_date_v1" in data_cols:
+        if has_v1:
             row["visit_date_v1"] = _rand_date(rng)
-        if "visit_date_v2" in data_cols:
+        if has_v2:
             row["visit_date_v2"] = _rand_date(rng)
-        # satisfaction
-        if "satisfaction" in data_cols:
+        if has_satisfaction:
             row["satisfaction"] = rnd_choice(rng, ["1", "2", "3", "4"]) if rng.random() < 0.98 else ""
         # bp
-        if "bp_sys" in data_cols:
+        if has_bp_sys:
             row["bp_sys"] = str(rng.randrange(90, 180))
-        if "bp_dia" in data_cols:
+        if has_bp_dia:
             row["bp_dia"] = str(rng.randrange(50, 110))
-        # notes
-        if "notes" in data_cols:
+        if has_notes:
             row["notes"] = "" if rng.random() < 0.6 else "Needs follow-up"
         # slider
-        if "pain_severity" in data_cols:
+        if has_pain:
             row["pain_severity"] = str(rng.randrange(0, 101))
-
         # ADLs
-        for v in ("adls_wash", "adls_dress", "adls_eat"):
-            if v in data_cols:
-                row[v] = rnd_choice(rng, ["0", "1"]) if rng.random() < 0.95 else ""
+        for v in adl_cols:
+            row[v] = rnd_choice(rng, ["0", "1"]) if rng.random() < 0.95 else ""
 
         rows.append(row)
 
     return rows
 
 
-def dictionary_and_data(project_idx: int, n: int, seed: int) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+@lru_cache(maxsize=64)
+def _dictionary_for(project_idx: int, seed: int) -> Tuple[Tuple[Dict[str, str], ...], tuple]:
+    """Build a project's dictionary once; also return the RNG state right after it."""
     rng = random.Random(seed + project_idx)
-    d = build_dictionary(project_idx, rng)
+    rows = build_dictionary(project_idx, rng)
+    return tuple(rows), rng.getstate()
+
+
+def dictionary_and_data(project_idx: int, n: int, seed: int) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    rows, state = _dictionary_for(project_idx, seed)
+    d = [dict(r) for r in rows]  # callers get their own copies of the cached rows
+    # Resume the stream where build_dictionary left it, so data matches an uncached run
+    rng = random.Random()
+    rng.setstate(state)
     data = generate_dataset(d, n, rng)
     return d, data
 
@@ -370,7 +402,7 @@ def dataset_headers(dict_rows: List[Dict[str, str]]) -> List[str]:
                     code, _lbl = part.split(",", 1)
                     pairs.append((code.strip(), _lbl.strip()))
             for code, _ in pairs:
-                cols.append(f"{v}___{code}")
+                cols.append(sys.intern(f"{v}___{code}"))
         else:
-            cols.append(v)
+            cols.append(sys.intern(v))
     return cols
@@ -4,7 +4,12 @@ import csv
 import json
 import os
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, List, Sequence
+
+try:  # optional speedup; stdlib json is the fallback
+    import orjson
+except ImportError:
+    orjson = None
 
 
 def read_csv(path: os.PathLike[str] | str) -> List[Dict[str, str]]:
@@ -13,27 +18,52 @@ def read_csv(path: os.PathLike[str] | str) -> List[Dict[str, str]]:
         return [dict(r) for r in reader]
 
 
-def write_csv(path: os.PathLike[str] | str, rows: Iterable[Dict[str, str]], headers: List[str]) -> None:
+def write_csv(path: os.PathLike[str] | str, rows: Iterable[Dict[str, str]], headers: Sequence[str]) -> None:
     Path(path).parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=headers, extrasaction="ignore")
-        writer.writeheader()
-        for r in rows:
-            writer.writerow({k: (r.get(k, "") if r.get(k, "") is not None else "") for k in headers})
+    with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+        # Plain writer over per-row value lists; missing keys become "" and the
+        # csv writer emits None as "" itself
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows([r.get(h, "") for h in headers] for r in rows)
 
 
-def write_json(path: os.PathLike[str] | str, obj) -> None:
+def write_json(path: os.PathLike[str] | str, obj, indent: bool = False) -> None:
+    """Write compact JSON plus a trailing newline; `indent=True` pretty-prints (2 spaces)."""
     Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE | (orjson.OPT_INDENT_2 if indent else 0)
+        Path(path).write_bytes(orjson.dumps(obj, option=option))
+        return
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(obj, f, ensure_ascii=False, indent=2)
+        if indent:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+        else:
+            json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+        f.write("\n")
 
 
 def read_json(path: os.PathLike[str] | str):
+    if orjson is not None:
+        return orjson.loads(Path(path).read_bytes())
     with open(path, encoding="utf-8") as f:
         return json.load(f)
 
 
+def dumps_sorted(obj) -> str:
+    """Compact JSON with sorted keys (canonical form for comparisons)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+# Full ASCII table (indexed by code point) keeps translate on its 1:1 fast path
+_SLUG_TABLE = "".join(c if c.isalnum() or c == "_" else "_" for c in map(chr, range(128)))
+
+
 def slug(s: str) -> str:
+    if s.isascii():  # common case: one C-level translate
+        return s.translate(_SLUG_TABLE)
     return "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in s)
 
 
@@ -6,11 +6,13 @@ Each check is deterministic given the dataset and dictionary and should avoid
 heavy dependencies for speed and portability.
 """
 
-from collections import Counter, defaultdict
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
-from .parse import Dictionary, DictField, iter_dataset_rows, is_date_ymd, is_int, is_num, guess_date_format
+from .parse import CATEGORICAL_TYPES, Dictionary, column_index, iter_dataset_records, is_int, is_num, guess_date_format
 
 
 @dataclass
@@ -45,10 +47,6 @@ class Finding:
         return out
 
 
-def _checkbox_expected_cols(f: DictField) -> List[str]:
-    return [f"{f.variable}___{code}" for code, _lbl in f.choices]
-
-
 # Thresholds (keep identical semantics; centralized for clarity)
 TYPE_SUCCESS_INT = 0.95
 TYPE_SUCCESS_NUM = 0.95
@@ -56,6 +54,8 @@ TYPE_SUCCESS_DATE = 0.95
 MISSINGNESS_SPIKE_THRESHOLD = 0.70
 REQUIRED_MISSING_RATE_THRESHOLD = 0.05
 REDCAP_META_COLUMNS = {"redcap_event_name", "redcap_repeat_instrument", "redcap_repeat_instance"}
+_TYPED_VALIDATIONS = frozenset({"integer", "number", "date_ymd", "date_mdy", "datetime_ymd"})
+_YMD_VALIDATIONS = frozenset({"date_ymd", "datetime_ymd"})
 
 
 def check_columns(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
@@ -76,7 +76,7 @@ def check_columns(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
     # Missing columns in data
     for f in dict_.fields:
         if f.field_type == "checkbox":
-            for col in _checkbox_expected_cols(f):
+            for col in dict_.checkbox_cols[f.variable]:
                 if col not in ds_cols:
                     findings.append(
                         Finding(
@@ -98,12 +98,7 @@ def check_columns(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
                 )
 
     # Extra columns in data
-    allowed: Set[str] = set()
-    for f in dict_.fields:
-        if f.field_type == "checkbox":
-            allowed.update(_checkbox_expected_cols(f))
-        else:
-            allowed.add(f.variable)
+    allowed: Set[str] = set(dict_.expected_columns)
     # Derive: treat known rename targets as non-extra to avoid double counting
     for orig, hints in _RENAME_HINTS.items():
         if orig in dict_.by_var:
@@ -112,7 +107,7 @@ def check_columns(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
     # Allow standard REDCap longitudinal/repeating meta columns
     allowed.update(REDCAP_META_COLUMNS)
     # Derive: treat checkbox-style columns for known checkbox vars as non-extra; handled by checkbox check
-    checkbox_vars = {f.variable for f in dict_.fields if f.field_type == "checkbox"}
+    checkbox_vars = dict_.checkbox_vars
     for col in dataset_cols:
         base = col.split("___", 1)[0]
         if base in checkbox_vars:
@@ -129,25 +124,24 @@ def check_columns(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
     return findings
 
 
-def check_longitudinal_context(dataset_path: str, dataset_cols: List[str]) -> List[Finding]:
-    present = sorted([c for c in REDCAP_META_COLUMNS if c in set(dataset_cols)])
+def check_longitudinal_context(scan: DatasetScan, dataset_cols: List[str]) -> List[Finding]:
+    present = sorted(REDCAP_META_COLUMNS.intersection(dataset_cols))
     if not present:
         return []
-    cols_to_collect = [c for c in ["redcap_event_name", "redcap_repeat_instrument", "redcap_repeat_instance"] if c in present]
-    vals = _collect_values(dataset_path, cols_to_collect)
     # Compute event stats
-    events = vals.get("redcap_event_name", []) if "redcap_event_name" in vals else []
-    ev_counts = Counter([e for e in events if e != ""]) if events else Counter()
+    events = scan.columns.get("redcap_event_name")
+    ev_counts = events.counts if events else Counter()
     top_events = [
         {"event": k, "n": v} for k, v in ev_counts.most_common(3)
     ] if ev_counts else []
-    total = len(events) if events else 0
-    rep_inst = vals.get("redcap_repeat_instrument", []) if "redcap_repeat_instrument" in vals else []
-    rep_idx = vals.get("redcap_repeat_instance", []) if "redcap_repeat_instance" in vals else []
-    repeat_rows = 0
-    if rep_inst or rep_idx:
-        # count rows where either repeat field is non-empty
-        repeat_rows = sum(1 for i in range(max(len(rep_inst), len(rep_idx))) if ((rep_inst[i] if i < len(rep_inst) else "") != "" or (rep_idx[i] if i < len(rep_idx) else "") != ""))
+    total = events.total if events else 0
+    # count rows where either repeat field is non-empty
+    repeat_pair = scan.pairs.get(("redcap_repeat_instrument", "redcap_repeat_instance"))
+    if repeat_pair is not None:
+        repeat_rows = scan.rows - repeat_pair[("", "")]
+    else:
+        rep = scan.columns.get("redcap_repeat_instrument") or scan.columns.get("redcap_repeat_instance")
+        repeat_rows = rep.total - rep.empty if rep else 0
     obs = {
         "distinct_events": len(ev_counts),
         "top_events": top_events,
@@ -167,13 +161,22 @@ def check_longitudinal_context(dataset_path: str, dataset_cols: List[str]) -> Li
 
 def check_checkbox_mismatch(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
     ds_cols: Set[str] = set(dataset_cols)
+    # Bucket columns by every prefix that precedes a "___" (prefix p buckets c iff
+    # c.startswith(p + "___")), so each checkbox field is a single lookup
+    by_prefix: Dict[str, Set[str]] = {}
+    for c in ds_cols:
+        i = c.find("___")
+        while i != -1:
+            by_prefix.setdefault(c[:i], set()).add(c)
+            i = c.find("___", i + 1)
     findings: List[Finding] = []
     for f in dict_.fields:
         if f.field_type != "checkbox":
             continue
-        expected = set(_checkbox_expected_cols(f))
-        added = sorted([c for c in ds_cols if c.startswith(f"{f.variable}___") and c not in expected])
-        missing = sorted([c for c in expected if c not in ds_cols])
+        expected = set(dict_.checkbox_cols[f.variable])
+        observed = by_prefix.get(f.variable, set())
+        added = sorted(observed - expected)
+        missing = sorted(expected - ds_cols)
         if added or missing:
             obs: Dict[str, object] = {}
             if added:
@@ -192,30 +195,172 @@ def check_checkbox_mismatch(dict_: Dictionary, dataset_cols: List[str]) -> List[
     return findings
 
 
-def _collect_values(path: str, cols: List[str], limit: int = 50000) -> Dict[str, List[str]]:
-    vals: Dict[str, List[str]] = {c: [] for c in cols}
-    n = 0
-    for row in iter_dataset_rows(path):
-        for c in cols:
-            vals[c].append((row.get(c, "") or "").strip())
-        n += 1
-        if n >= limit:
-            break
-    return vals
+@dataclass
+class ColumnStats:
+    """Aggregates for one dataset column from a single scan (values stripped).
+
+    `counts` holds non-empty values in first-seen order; `first_rows` maps each
+    such value to the row positions of its first few occurrences so example
+    lists can be rebuilt in row order.
+    """
+
+    total: int = 0
+    empty: int = 0
+    counts: Counter[str] = field(default_factory=Counter)
+    first_rows: Dict[str, List[int]] = field(default_factory=dict)
+
+    @property
+    def nonempty(self) -> int:
+        return self.total - self.empty
+
+    def count_where(self, predicate: Callable[[str], bool]) -> int:
+        """Non-empty cells whose value satisfies `predicate` (called once per distinct value)."""
+        return sum(n for v, n in self.counts.items() if predicate(v))
+
+    def rejects(self, predicate: Callable[[str], bool]) -> Dict[str, int]:
+        """Distinct non-empty values failing `predicate`, with their counts."""
+        counts = self.counts
+        return {v: counts[v] for v in counts if not predicate(v)}
+
+    def examples(self, predicate: Callable[[str], bool], k: int = 5) -> List[str]:
+        """First `k` non-empty cells (in row order, repeats included) satisfying `predicate`."""
+        hits = ((pos, v) for v, rows in self.first_rows.items() if predicate(v) for pos in rows)
+        return [v for _pos, v in heapq.nsmallest(k, hits)]
+
+
+@dataclass
+class KeyStats:
+    """Blank and repeated values of the primary-key column, over every data row."""
+
+    column: str
+    blanks: int = 0
+    duplicates: Counter[str] = field(default_factory=Counter)  # value -> repeat occurrences
+    _seen: Set[str] = field(default_factory=set, repr=False, compare=False)
+
+    def add(self, value: str) -> None:
+        """Fold one key cell into the tallies."""
+        v = value.strip()
+        if v == "":
+            self.blanks += 1
+        elif v in self._seen:
+            self.duplicates[v] += 1
+        else:
+            self._seen.add(v)
+
+
+@dataclass
+class DatasetScan:
+    rows: int
+    columns: Dict[str, ColumnStats]
+    pairs: Dict[Tuple[str, str], Counter[Tuple[str, str]]]
+    key: Optional[KeyStats] = None
+    total_rows: int = 0  # every data row; `rows` stops at the scan limit
 
 
-def _examples(values: List[str], predicate) -> List[str]:
-    out: List[str] = []
-    for v in values:
-        if predicate(v):
-            out.append(v)
-        if len(out) >= 5:
-            break
-    return out
+# Column pairs whose joint values some checks need (branching, repeat instruments)
+_SCAN_PAIRS = (("sex", "pregnant"), ("redcap_repeat_instrument", "redcap_repeat_instance"))
+_EXAMPLE_ROWS = 5
+
+
+def scan_plan(dict_: Dictionary, dataset_cols: List[str]) -> Tuple[Set[str], Set[str], List[Tuple[str, str]]]:
+    """Columns whose values the checks read, the subset needing row-ordered
+    examples, and the column pairs whose joint values are needed.
+
+    Every other column only needs its empty count. Keep in sync with the checks
+    that read `ColumnStats.counts` / `ColumnStats.examples` / `DatasetScan.pairs`.
+    """
+    ds = set(dataset_cols)
+    example_cols = {dscol for dscol, _exp in _type_targets(dict_, dataset_cols).values()}
+    value_cols = set(example_cols)
+    value_cols.update(f.variable for f in dict_.fields if f.field_type in CATEGORICAL_TYPES and f.variable in ds)
+    value_cols.update(c for c, unit in _note_units(dict_, dataset_cols).items() if unit == "cm")
+    value_cols.update(c for c in ("redcap_event_name",) if c in ds)
+    pairs = [p for p in _SCAN_PAIRS if p[0] in ds and p[1] in ds]
+    if not _branching_applies(dict_, dataset_cols):
+        pairs = [p for p in pairs if p != ("sex", "pregnant")]
+    return value_cols, example_cols, pairs
+
+
+def scan_dataset(
+    path: str,
+    cols: Iterable[str],
+    value_cols: Optional[Set[str]] = None,
+    example_cols: Optional[Set[str]] = None,
+    pairs: Optional[Iterable[Tuple[str, str]]] = None,
+    key: Optional[str] = None,
+    limit: int = 50000,
+) -> DatasetScan:
+    """Stream the dataset once (up to `limit` rows) and aggregate per-column stats.
+
+    All value-based checks consume the returned scan instead of re-reading the CSV.
+    Value counters are kept for `value_cols` and example positions for
+    `example_cols` (both default to every column); other columns only count
+    empties. Joint counters are kept for `pairs` (default: all known pairs
+    present). See `scan_plan`. When `key` names a header column its blank and
+    duplicate values are tallied over every row, past `limit` too; rows past
+    the limit are otherwise only counted (`total_rows`).
+    """
+    stats: Dict[str, ColumnStats] = {c: ColumnStats() for c in cols}
+    records = iter_dataset_records(path)
+    index = column_index(next(records, []))
+    if value_cols is None:
+        value_cols = set(stats)
+    if example_cols is None:
+        example_cols = value_cols
+    empty_slots = [(index[c], st) for c, st in stats.items() if c in index and c not in value_cols]
+    value_slots = [(index[c], st) for c, st in stats.items() if c in index and c in value_cols and c not in example_cols]
+    slots = [(index[c], st) for c, st in stats.items() if c in index and c in value_cols and c in example_cols]
+    pair_counts = {
+        p: Counter() for p in (_SCAN_PAIRS if pairs is None else pairs) if all(c in index and c in stats for c in p)
+    }
+    pair_slots = [(index[a], index[b], counter) for (a, b), counter in pair_counts.items()]
+    key_idx = index.get(key) if key is not None else None
+    key_stats = KeyStats(key) if key_idx is not None else None
+    n = -1
+    # islice bounds the scan without a per-row limit test; n is the 0-based row position
+    for n, row in enumerate(islice(records, limit)):
+        for i, st in empty_slots:
+            v = row[i]
+            if not v or v.isspace():
+                st.empty += 1
+        for i, st in value_slots:
+            v = row[i].strip()
+            if v == "":
+                st.empty += 1
+            else:
+                st.counts[v] += 1
+        for i, st in slots:
+            v = row[i].strip()
+            if v == "":
+                st.empty += 1
+                continue
+            st.counts[v] += 1
+            seen = st.first_rows.get(v)
+            if seen is None:
+                st.first_rows[v] = [n]
+            elif len(seen) < _EXAMPLE_ROWS:
+                seen.append(n)
+        for a, b, counter in pair_slots:
+            counter[(row[a].strip(), row[b].strip())] += 1
+        if key_stats is not None:
+            key_stats.add(row[key_idx])
+    n += 1
+    total = n
+    if key_stats is not None:
+        for row in records:
+            key_stats.add(row[key_idx])
+            total += 1
+    else:
+        total += sum(1 for _ in records)
+    for c, st in stats.items():
+        st.total = n
+        if c not in index:  # absent from the header: every cell reads as empty
+            st.empty = n
+    return DatasetScan(rows=n, columns=stats, pairs=pair_counts, key=key_stats, total_rows=total)
 
 
 def detect_export_mode_labels(
-    dict_: Dictionary, dataset_path: str, dataset_cols: List[str]
+    dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str]
 ) -> Tuple[bool, List[Finding]]:
     """Detect if dataset likely contains labels instead of codes for categorical fields.
 
@@ -224,29 +369,35 @@ def detect_export_mode_labels(
     - If label matches dominate and occur in multiple fields, flag and suggest re-export.
     Returns (labels_detected, findings).
     """
+    ds = set(dataset_cols)
     cat_fields = [
         f for f in dict_.fields
-        if f.field_type in {"radio", "dropdown", "yesno", "truefalse"} and f.variable in dataset_cols
+        if f.field_type in CATEGORICAL_TYPES and f.variable in ds
     ]
     if not cat_fields:
         return False, []
-    vals = _collect_values(dataset_path, [f.variable for f in cat_fields])
     total_code = total_label = total_nonempty = 0
     label_majority_fields = 0
     fields_checked = 0
     for f in cat_fields:
-        vlist = [v for v in vals.get(f.variable, []) if v != ""]
-        if not vlist:
+        st = scan.columns[f.variable]
+        n = st.nonempty
+        if not n:
             continue
         fields_checked += 1
         codes = {c for c, _ in f.choices}
         labels = {lbl for _, lbl in f.choices}
-        n_code = sum(1 for v in vlist if v in codes)
-        n_label = sum(1 for v in vlist if v in labels)
+        # One walk over the distinct values; a value may be both a code and a label
+        n_code = n_label = 0
+        for v, c in st.counts.items():
+            if v in codes:
+                n_code += c
+            if v in labels:
+                n_label += c
         total_code += n_code
         total_label += n_label
-        total_nonempty += len(vlist)
-        if len(vlist) > 0 and n_label / len(vlist) >= 0.8 and n_label > n_code:
+        total_nonempty += n
+        if n > 0 and n_label / n >= 0.8 and n_label > n_code:
             label_majority_fields += 1
 
     if fields_checked == 0:
@@ -272,47 +423,49 @@ def detect_export_mode_labels(
 
 
 def _build_rename_map(dict_: Dictionary, dataset_cols: List[str]) -> Dict[str, str]:
+    """Dictionary variable -> renamed dataset column, memoized per header set on `dict_`."""
+    key = tuple(dataset_cols)
+    mapping = dict_.rename_maps.get(key)
+    if mapping is not None:
+        return mapping
     ds = set(dataset_cols)
-    mapping: Dict[str, str] = {}
+    mapping = {}
     for orig, hints in _RENAME_HINTS.items():
         if orig in dict_.by_var and orig not in ds:
             for h in hints:
                 if h in ds:
                     mapping[orig] = h
                     break
+    dict_.rename_maps[key] = mapping
     return mapping
 
 
-def check_types(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -> List[Finding]:
-    # Map dict variables to dataset columns (handles rename drift)
+def _type_targets(dict_: Dictionary, dataset_cols: List[str]) -> Dict[str, Tuple[str, str]]:
+    """Validated text variables -> (dataset column, validation); handles rename drift."""
     rename_map = _build_rename_map(dict_, dataset_cols)
-    var_to_dscol: Dict[str, str] = {}
-    expected: Dict[str, str] = {}
+    ds = set(dataset_cols)
+    targets: Dict[str, Tuple[str, str]] = {}
     for f in dict_.fields:
-        if f.field_type == "text" and f.validation in {"integer", "number", "date_ymd", "date_mdy", "datetime_ymd"}:
-            if f.variable in dataset_cols:
-                var_to_dscol[f.variable] = f.variable
-                expected[f.variable] = f.validation
+        if f.field_type == "text" and f.validation in _TYPED_VALIDATIONS:
+            if f.variable in ds:
+                targets[f.variable] = (f.variable, f.validation)
             elif f.variable in rename_map:
-                dscol = rename_map[f.variable]
-                var_to_dscol[f.variable] = dscol
-                expected[f.variable] = f.validation
-    ds_cols_to_check = list(var_to_dscol.values())
-    vals = _collect_values(dataset_path, ds_cols_to_check)
+                targets[f.variable] = (rename_map[f.variable], f.validation)
+    return targets
 
+
+def check_types(dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str]) -> List[Finding]:
     findings: List[Finding] = []
-    for var, dscol in var_to_dscol.items():
-        vlist = [v for v in vals.get(dscol, []) if v != ""]
-        if not vlist:
+    for var, (dscol, exp) in _type_targets(dict_, dataset_cols).items():
+        st = scan.columns[dscol]
+        n = st.nonempty
+        if not n:
             continue
-        exp = expected[var]
-        ok = 0
-        n = len(vlist)
-        obs_kind = "string"
         if exp == "integer":
-            ok = sum(1 for v in vlist if is_int(v))
+            bad = st.rejects(is_int)
+            ok = n - sum(bad.values())
             if ok / n < TYPE_SUCCESS_INT:
-                bad_examples = _examples(vlist, lambda v: not is_int(v))
+                bad_examples = st.examples(bad.__contains__)
                 findings.append(
                     Finding(
                         type="type_mismatch",
@@ -327,9 +480,10 @@ def check_types(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -
                 )
             continue
         if exp == "number":
-            ok = sum(1 for v in vlist if is_num(v))
+            bad = st.rejects(is_num)
+            ok = n - sum(bad.values())
             if ok / n < TYPE_SUCCESS_NUM:
-                bad_examples = _examples(vlist, lambda v: not is_num(v))
+                bad_examples = st.examples(bad.__contains__)
                 findings.append(
                     Finding(
                         type="type_mismatch",
@@ -343,13 +497,16 @@ def check_types(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -
                     )
                 )
             continue
-        if exp in {"date_ymd", "datetime_ymd"}:
-            ok = sum(1 for v in vlist if is_date_ymd(v))
+        if exp in _YMD_VALIDATIONS:
+            # Classify each distinct value once; "date_ymd" is exactly is_date_ymd
+            kinds = {v: guess_date_format(v) for v in st.counts}
+            ok = sum(c for v, c in st.counts.items() if kinds[v] == "date_ymd")
             if ok / n < TYPE_SUCCESS_DATE:
                 # try to guess observed non-ymd variant
-                kind_counts = Counter(guess_date_format(v) for v in vlist)
+                kind_counts = Counter(kinds.values())
                 observed = "date_mdy" if kind_counts.get("date_mdy", 0) > 0 else "string"
-                bad_examples = _examples(vlist, lambda v: guess_date_format(v) != exp)
+                off = {v for v, k in kinds.items() if k != exp}
+                bad_examples = st.examples(off.__contains__)
                 findings.append(
                     Finding(
                         type="type_mismatch",
@@ -366,17 +523,15 @@ def check_types(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -
     return findings
 
 
-def check_domains(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -> List[Finding]:
-    to_check: List[Tuple[str, Set[str]]] = []
-    for f in dict_.fields:
-        if f.field_type in {"radio", "dropdown", "yesno", "truefalse"} and f.variable in dataset_cols:
-            allowed = set(code for code, _ in f.choices)
-            to_check.append((f.variable, allowed))
-    vals = _collect_values(dataset_path, [c for c, _ in to_check])
+def check_domains(dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str]) -> List[Finding]:
+    # Allowed-code sets are built once per Dictionary
+    ds = set(dataset_cols)
+    to_check = [(var, allowed) for var, allowed in dict_.categorical_codes if var in ds]
     findings: List[Finding] = []
     for col, allowed in to_check:
-        vset = set(v for v in vals[col] if v != "")
-        unexpected = sorted([v for v in vset if v not in allowed])
+        counts = scan.columns[col].counts
+        # Distinct observed values minus allowed codes: key-set arithmetic on the counter
+        unexpected = sorted(counts.keys() - allowed)
         if unexpected:
             expected_pairs = [f"{c}={lbl}" for c, lbl in dict_.choices[col]]
             findings.append(
@@ -388,19 +543,26 @@ def check_domains(dict_: Dictionary, dataset_path: str, dataset_cols: List[str])
                     expected=expected_pairs,
                     observed=unexpected,
                     examples=unexpected[:5],
-                    rows_affected=sum(1 for v in vals[col] if v in unexpected),
+                    rows_affected=sum(counts[v] for v in unexpected),
                 )
             )
     return findings
 
 
-def check_primary_key(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -> List[Finding]:
-    """Ensure primary key column exists and is unique.
+def primary_key(dict_: Dictionary, dataset_cols: List[str]) -> Optional[str]:
+    """Primary key variable: 'record_id' if present; else first variable in dictionary."""
+    if "record_id" in dataset_cols:
+        return "record_id"
+    return dict_.fields[0].variable if dict_.fields else None
+
 
-    Preference order: 'record_id' if present; else first variable in dictionary.
+def check_primary_key(dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str]) -> List[Finding]:
+    """Ensure primary key column exists and is unique (see `primary_key`).
+
+    Reads the key tallies from a scan made with `key=primary_key(...)`.
     """
     findings: List[Finding] = []
-    pk = "record_id" if "record_id" in dataset_cols else (dict_.fields[0].variable if dict_.fields else None)
+    pk = primary_key(dict_, dataset_cols)
     if not pk:
         return findings
     if pk not in dataset_cols:
@@ -413,21 +575,10 @@ def check_primary_key(dict_: Dictionary, dataset_path: str, dataset_cols: List[s
             )
         )
         return findings
-    # Check duplicates (ignore blanks)
-    seen: Set[str] = set()
-    dups: Counter[str] = Counter()
-    total = 0
-    blanks = 0
-    for row in iter_dataset_rows(dataset_path):
-        v = (row.get(pk, "") or "").strip()
-        total += 1
-        if v == "":
-            blanks += 1
-            continue
-        if v in seen:
-            dups[v] += 1
-        else:
-            seen.add(v)
+    if scan.key is None:  # scanned without `key=`: no tallies to report from
+        return findings
+    # Check duplicates (blanks are ignored)
+    dups = scan.key.duplicates
     if dups:
         examples = [k for k, _ in dups.most_common(5)]
         rows_affected = sum(dups.values())
@@ -445,20 +596,20 @@ def check_primary_key(dict_: Dictionary, dataset_path: str, dataset_cols: List[s
 
 
 def check_required_fields(
-    dict_: Dictionary, dataset_path: str, dataset_cols: List[str], threshold: float = REQUIRED_MISSING_RATE_THRESHOLD
+    dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str], threshold: float = REQUIRED_MISSING_RATE_THRESHOLD
 ) -> List[Finding]:
     """For dictionary-required fields, flag high missing rates in the dataset."""
-    req_vars = [f.variable for f in dict_.fields if getattr(f, "required", False) and f.variable in dataset_cols]
+    ds = set(dataset_cols)
+    req_vars = [f.variable for f in dict_.fields if getattr(f, "required", False) and f.variable in ds]
     if not req_vars:
         return []
-    vals = _collect_values(dataset_path, req_vars)
     findings: List[Finding] = []
     for var in req_vars:
-        col_vals = vals.get(var, [])
-        if not col_vals:
+        st = scan.columns[var]
+        if not st.total:
             continue
-        total = len(col_vals)
-        missing = sum(1 for v in col_vals if (v or "").strip() == "")
+        total = st.total
+        missing = st.empty
         if total >= 20 and missing / total >= threshold:
             findings.append(
                 Finding(
@@ -473,12 +624,12 @@ def check_required_fields(
     return findings
 
 
-def check_missingness_spike(dataset_path: str, dataset_cols: List[str], threshold: float = MISSINGNESS_SPIKE_THRESHOLD) -> List[Finding]:
-    vals = _collect_values(dataset_path, dataset_cols)
+def check_missingness_spike(scan: DatasetScan, dataset_cols: List[str], threshold: float = MISSINGNESS_SPIKE_THRESHOLD) -> List[Finding]:
     findings: List[Finding] = []
     for col in dataset_cols:
-        total = len(vals[col])
-        empties = sum(1 for v in vals[col] if v == "")
+        st = scan.columns[col]
+        total = st.total
+        empties = st.empty
         if total >= 50 and empties / total >= threshold:
             findings.append(
                 Finding(
@@ -492,30 +643,33 @@ def check_missingness_spike(dataset_path: str, dataset_cols: List[str], threshol
     return findings
 
 
-def check_unit_anomaly(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -> List[Finding]:
+def _note_units(dict_: Dictionary, dataset_cols: List[str]) -> Dict[str, str]:
+    """Dataset columns whose field_note declares `units=<unit>`, mapped to the unit."""
+    ds = set(dataset_cols)
+    return {var: unit for var, unit in dict_.note_units if var in ds}
+
+
+def check_unit_anomaly(dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str]) -> List[Finding]:
     # Heuristic:
     # if field_note contains 'units=cm', and >5% of numeric values < 100 while majority > 100 => hint inches subset
-    note_units = {}
-    for f in dict_.fields:
-        note = (f.raw.get("field_note") or "").lower()
-        if "units=" in note and f.variable in dataset_cols:
-            unit = note.split("units=", 1)[1].split()[0]
-            note_units[f.variable] = unit
-    vals = _collect_values(dataset_path, list(note_units.keys()))
     findings: List[Finding] = []
-    for col, unit in note_units.items():
-        vnums = []
-        for v in vals[col]:
+    for col, unit in _note_units(dict_, dataset_cols).items():
+        if unit != "cm":  # the only unit with a heuristic; skip parsing the rest
+            continue
+        n_num = small = large = 0
+        for v, n in scan.columns[col].counts.items():
             try:
-                if v != "":
-                    vnums.append(float(v))
+                x = float(v)
             except Exception:
-                pass
-        if len(vnums) < 20:
+                continue
+            n_num += n
+            if x < 100.0:
+                small += n
+            if x >= 100.0:
+                large += n
+        if n_num < 20:
             continue
-        small = sum(1 for x in vnums if x < 100.0)
-        large = sum(1 for x in vnums if x >= 100.0)
-        if unit == "cm" and small / len(vnums) >= 0.05 and large / len(vnums) >= 0.5:
+        if small / n_num >= 0.05 and large / n_num >= 0.5:
             findings.append(
                 Finding(
                     type="unit_anomaly",
@@ -530,13 +684,18 @@ def check_unit_anomaly(dict_: Dictionary, dataset_path: str, dataset_cols: List[
     return findings
 
 
-def check_branching(dict_: Dictionary, dataset_path: str, dataset_cols: List[str]) -> List[Finding]:
-    # Detect violations of simple branching: pregnant only allowed when sex = '1' (Female)
-    # Handle both raw codes and label-exported values using dictionary choices.
+def _branching_applies(dict_: Dictionary, dataset_cols: List[str]) -> bool:
+    """True when the sex/pregnant branching rule can be checked against this dataset."""
     if "sex" not in dataset_cols or "pregnant" not in dataset_cols:
-        return []
+        return False
     cond = dict_.by_var.get("pregnant").branching_logic if dict_.by_var.get("pregnant") else ""
-    if "[sex]" not in cond:
+    return "[sex]" in cond
+
+
+def check_branching(dict_: Dictionary, scan: DatasetScan, dataset_cols: List[str]) -> List[Finding]:
+    # Detect violations of simple branching: pregnant only allowed when sex = '1' (Female)
+    # Handle both raw codes and label-exported values using dictionary choices.
+    if not _branching_applies(dict_, dataset_cols):
         return []
     # Build normalization sets from dictionary choices (fallback to common labels)
     sex_field = dict_.by_var.get("sex")
@@ -563,14 +722,13 @@ def check_branching(dict_: Dictionary, dataset_path: str, dataset_cols: List[str
                 if tok:
                     preg_yes_tokens.add(tok)
 
-    vals = _collect_values(dataset_path, ["sex", "pregnant"])
     affected = 0
-    for s, p in zip(vals["sex"], vals["pregnant"]):
-        s_norm = (s or "").strip().lower()
-        p_norm = (p or "").strip().lower()
+    for (s, p), n in scan.pairs[("sex", "pregnant")].items():
+        s_norm = s.lower()
+        p_norm = p.lower()
         # Violation when sex indicates male and pregnant indicates yes
         if s_norm in male_tokens and p_norm in preg_yes_tokens:
-            affected += 1
+            affected += n
     if affected:
         return [
             Finding(
@@ -587,17 +745,12 @@ def check_branching(dict_: Dictionary, dataset_path: str, dataset_cols: List[str
 
 def check_matrix_consecutive(dict_: Dictionary) -> List[Finding]:
     # A group's fields must be consecutive in dictionary order
-    idx: Dict[str, List[int]] = defaultdict(list)
-    for i, f in enumerate(dict_.fields):
-        if f.matrix_group:
-            idx[f.matrix_group].append(i)
     findings: List[Finding] = []
-    for group, positions in idx.items():
+    for group, positions in dict_.matrix_positions.items():
         if not positions:
             continue
-        positions = sorted(positions)
-        consecutive = all(positions[j] + 1 == positions[j + 1] for j in range(len(positions) - 1))
-        if not consecutive:
+        # Positions are unique and ascending, so consecutive iff the span equals the count
+        if positions[-1] - positions[0] != len(positions) - 1:
             findings.append(
                 Finding(
                     type="matrix_nonconsecutive",
@@ -617,23 +770,16 @@ _RENAME_HINTS = {
 
 
 def check_rename_drift(dict_: Dictionary, dataset_cols: List[str]) -> List[Finding]:
-    ds = set(dataset_cols)
-    findings: List[Finding] = []
-    for orig, hints in _RENAME_HINTS.items():
-        if orig in dict_.by_var and orig not in ds:
-            for h in hints:
-                if h in ds:
-                    findings.append(
-                        Finding(
-                            type="rename_drift",
-                            variable=orig,
-                            severity="warn",
-                            where={"dataset_column": h},
-                            observed={"new": h},
-                        )
-                    )
-                    break
-    return findings
+    return [
+        Finding(
+            type="rename_drift",
+            variable=orig,
+            severity="warn",
+            where={"dataset_column": h},
+            observed={"new": h},
+        )
+        for orig, h in _build_rename_map(dict_, dataset_cols).items()
+    ]
 
 
 def build_summary(
@@ -644,15 +790,27 @@ def build_summary(
     pk_blanks: int | None = None,
     pk_duplicates: int | None = None,
 ) -> dict:
+    # Per-field maps in one pass over the fields (a repeated variable keeps its
+    # first position and its last value, as with dict comprehensions)
+    names: List[str] = []
+    choices: Dict[str, List[str]] = {}
+    validations: Dict[str, str] = {}
+    required: Dict[str, bool] = {}
+    for f in dict_.fields:
+        v = f.variable
+        names.append(v)
+        choices[v] = [f"{c}={lbl}" for c, lbl in dict_.choices.get(v, [])]
+        validations[v] = f.validation or ""
+        required[v] = bool(getattr(f, "required", False))
     summary = {
         "rows": n_rows,
         "cols": len(dataset_cols),
         "dict_fields": len(dict_.fields),
         "dataset_columns": dataset_cols,
-        "dict_field_names": [f.variable for f in dict_.fields],
-        "dict_choices": {v: [f"{c}={lbl}" for c, lbl in dict_.choices.get(v, [])] for v in [f.variable for f in dict_.fields]},
-        "dict_validations": {f.variable: (f.validation or "") for f in dict_.fields},
-        "dict_required_flags": {f.variable: bool(getattr(f, "required", False)) for f in dict_.fields},
+        "dict_field_names": names,
+        "dict_choices": choices,
+        "dict_validations": validations,
+        "dict_required_flags": required,
     }
     if primary_key is not None:
         summary["primary_key"] = primary_key
@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import argparse
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import re
 from typing import List
 
-from .parse import load_dictionary, load_dataset_headers, iter_dataset_rows
+from .parse import load_dictionary, load_dataset_headers
 from .checks import (
     Finding,
+    scan_dataset,
+    scan_plan,
     build_summary,
+    primary_key,
     check_primary_key,
     check_branching,
     check_checkbox_mismatch,
@@ -24,7 +28,17 @@ from .checks import (
     check_types,
 )
 from .checks import detect_export_mode_labels, check_required_fields
-from .report import build_report_html
+from .report import write_report_html
+
+try:  # optional speedup; stdlib json is the fallback
+    import orjson
+except ImportError:
+    orjson = None
+
+# Folder-name patterns for `_infer_prev_findings`
+_PERTURBED_VN = re.compile(r"^(?P<base>.+_perturbed)_v(?P<ver>\d+)$")
+_BASE_VN = re.compile(r"^(?P<base>.+)_v(?P<ver>\d+)$")
+_NESTED_VN = re.compile(r"^v(?P<ver>\d+)$")
 
 
 def _infer_prev_findings(cur_dir: Path) -> Path | None:
@@ -39,7 +53,7 @@ def _infer_prev_findings(cur_dir: Path) -> Path | None:
     name = cur_dir.name
 
     # Case: perturbed_vN special-casing v2 -> perturbed
-    m = re.match(r"^(?P<base>.+_perturbed)_v(?P<ver>\d+)$", name)
+    m = _PERTURBED_VN.match(name)
     if m:
         base = m.group("base")
         ver = int(m.group("ver"))
@@ -50,7 +64,7 @@ def _infer_prev_findings(cur_dir: Path) -> Path | None:
         return cand if cand.exists() else None
 
     # Case: generic _vN suffix
-    m = re.match(r"^(?P<base>.+)_v(?P<ver>\d+)$", name)
+    m = _BASE_VN.match(name)
     if m:
         base = m.group("base")
         ver = int(m.group("ver"))
@@ -59,7 +73,7 @@ def _infer_prev_findings(cur_dir: Path) -> Path | None:
             return cand if cand.exists() else None
 
     # Case: nested vN folder
-    m = re.match(r"^v(?P<ver>\d+)$", name)
+    m = _NESTED_VN.match(name)
     if m:
         ver = int(m.group("ver"))
         if ver > 1:
@@ -95,11 +109,23 @@ def _infer_prev_from_pointer(cur_dir: Path) -> Path | None:
 
 def _read_prev(prev_path: Path) -> dict | None:
     try:
+        if orjson is not None:
+            return orjson.loads(prev_path.read_bytes())
         return json.loads(prev_path.read_text(encoding="utf-8"))
     except Exception:
         return None
 
 
+def _write_findings(path: Path, result: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    # Stream the encoder's chunks into the file instead of building one str
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+
+
 def main(argv: List[str] | None = None) -> None:
     ap = argparse.ArgumentParser(description="Validate REDCap dataset against dictionary and generate report + findings")
     ap.add_argument("--dict", dest="dict_path", required=True)
@@ -120,54 +146,71 @@ def main(argv: List[str] | None = None) -> None:
     if prev is None and not args.no_prev:
         cur_dir = findings_path.parent
         prev = _infer_prev_from_pointer(cur_dir) or _infer_prev_findings(cur_dir)
+    prev_obj = _read_prev(prev) if prev and prev.exists() else None
+
+    result = validate(dict_path, data_path, prev_obj)
+    findings_dicts = result["findings"]
+    summary = result["summary"]
+
+    # Write outputs; findings.json goes out on a worker thread while the HTML
+    # renders (neither mutates `result`), so the two writes' I/O overlaps
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        wrote = ex.submit(_write_findings, findings_path, result)
+        write_report_html(html_path, summary, findings_dicts)
+        wrote.result()
+
+    # Also print a terse summary
+    print(f"Findings: {len(findings_dicts)} | Rows={summary['rows']} Cols={summary['cols']} Dict={summary['dict_fields']}")
 
+
+def validate(dict_path: str | Path, data_path: str | Path, prev_obj: dict | None = None) -> dict:
+    """Run all checks and return the findings document {"summary", "findings"}.
+
+    `prev_obj` is a previous run's findings document (as written by `main`);
+    when given, since-last-run diffs are included. Nothing is written to disk.
+    """
+    data_path = Path(data_path)
     dd = load_dictionary(dict_path)
     dataset_cols = load_dataset_headers(data_path)
-    # Count rows and compute primary key stats in a single pass
-    n_rows = 0
-    pk_var: str | None = None
-    if "record_id" in dataset_cols:
-        pk_var = "record_id"
-    elif dd.fields:
-        pk_var = dd.fields[0].variable
-    pk_blanks = 0
-    pk_duplicates = 0
-    seen_pk = set()
-    for row in iter_dataset_rows(data_path):
-        n_rows += 1
-        if pk_var:
-            v = (row.get(pk_var, "") or "").strip()
-            if v == "":
-                pk_blanks += 1
-            elif v in seen_pk:
-                pk_duplicates += 1
-            else:
-                seen_pk.add(v)
-
-    # If previous findings are provided, pre-compute previous dataset columns
-    prev_cols: set[str] = set()
-    if prev and prev.exists():
-        prev_obj = _read_prev(prev)
-        if isinstance(prev_obj, dict):
-            prev_sum = prev_obj.get("summary") or {}
-            prev_cols = set(prev_sum.get("dataset_columns") or [])
+    ds_cols = frozenset(dataset_cols)
+
+    # If previous findings are provided, extract their summary and columns once
+    prev_sum: dict = {}
+    prev_cols: frozenset[str] = frozenset()
+    if isinstance(prev_obj, dict):
+        prev_sum = prev_obj.get("summary") or {}
+        prev_cols = frozenset(prev_sum.get("dataset_columns") or [])
+
+    # Stream the dataset once; value-based checks read these aggregates
+    value_cols, example_cols, pairs = scan_plan(dd, dataset_cols)
+    pk_var = primary_key(dd, dataset_cols)
+    scan = scan_dataset(str(data_path), dataset_cols, value_cols, example_cols, pairs, key=pk_var)
+
+    # Row count and primary key stats fall out of the same pass
+    n_rows = scan.total_rows
+    pk_blanks = pk_duplicates = 0
+    if scan.key is not None:
+        pk_blanks = scan.key.blanks
+        pk_duplicates = sum(scan.key.duplicates.values())
+    elif pk_var:  # key column absent from the header: every row reads as blank
+        pk_blanks = n_rows
 
     # Run checks
     findings: List[Finding] = []
     findings += check_columns(dd, dataset_cols)
-    findings += check_longitudinal_context(str(data_path), dataset_cols)
+    findings += check_longitudinal_context(scan, dataset_cols)
     findings += check_rename_drift(dd, dataset_cols)
     findings += check_checkbox_mismatch(dd, dataset_cols)
-    findings += check_types(dd, str(data_path), dataset_cols)
+    findings += check_types(dd, scan, dataset_cols)
     # Detect label-export mode; if detected, suppress domain_mismatch noise
-    labels_detected, label_findings = detect_export_mode_labels(dd, str(data_path), dataset_cols)
+    labels_detected, label_findings = detect_export_mode_labels(dd, scan, dataset_cols)
     findings += label_findings
     if not labels_detected:
-        findings += check_domains(dd, str(data_path), dataset_cols)
+        findings += check_domains(dd, scan, dataset_cols)
     else:
         # Optionally compute how many domain mismatches would have appeared (suppressed count)
         try:
-            suppressed = check_domains(dd, str(data_path), dataset_cols)
+            suppressed = check_domains(dd, scan, dataset_cols)
             if label_findings:
                 lf = label_findings[0]
                 # augment observed
@@ -179,119 +222,101 @@ def main(argv: List[str] | None = None) -> None:
         except Exception:
             pass
     from .checks import check_unit_anomaly
-    findings += check_unit_anomaly(dd, str(data_path), dataset_cols)
-    findings += check_missingness_spike(str(data_path), dataset_cols)
-    findings += check_primary_key(dd, str(data_path), dataset_cols)
-    findings += check_required_fields(dd, str(data_path), dataset_cols)
-    findings += check_branching(dd, str(data_path), dataset_cols)
+    findings += check_unit_anomaly(dd, scan, dataset_cols)
+    findings += check_missingness_spike(scan, dataset_cols)
+    findings += check_primary_key(dd, scan, dataset_cols)
+    findings += check_required_fields(dd, scan, dataset_cols)
+    findings += check_branching(dd, scan, dataset_cols)
     findings += check_matrix_consecutive(dd)
 
-    # Filter generic extras for new columns if this is a since-last-run scenario
-    if prev_cols:
-        new_cols = {c for c in dataset_cols if c not in prev_cols}
-        findings = [
-            f for f in findings
-            if not (f.type == "extra_column_in_data" and f.variable in new_cols)
-        ]
-
-    # Convert to dicts
-    findings_dicts = [f.as_dict() for f in findings]
+    # Convert to dicts, dropping generic extras for columns that are new since
+    # the last run (reported below as extra_column_since_last_run instead)
+    new_cols = ds_cols - prev_cols if prev_cols else frozenset()
+    findings_dicts = [
+        f.as_dict() for f in findings
+        if not (f.type == "extra_column_in_data" and f.variable in new_cols)
+    ]
 
     # Build summary (and embed current shapes to enable since-last-run in future)
     summary = build_summary(dd, dataset_cols, n_rows, pk_var, pk_blanks, pk_duplicates)
 
     # Since last run diffs (if prev provided and has summary)
-    if prev and prev.exists():
-        prev_obj = _read_prev(prev)
-        if prev_obj and isinstance(prev_obj, dict):
-            prev_sum = prev_obj.get("summary") or {}
-            # new columns
-            prev_cols2 = set(prev_sum.get("dataset_columns") or [])
-            for col in dataset_cols:
-                if col not in prev_cols2:
-                    findings_dicts.append(
-                        {
-                            "type": "extra_column_since_last_run",
-                            "variable": col,
-                            "severity": "info",
-                            "where": {"dataset_column": col},
-                            "rows_affected": n_rows,
-                        }
-                    )
-            # dropped columns
-            for col in prev_cols2:
-                if col not in set(dataset_cols):
-                    findings_dicts.append(
-                        {
-                            "type": "missing_column_since_last_run",
-                            "variable": col,
-                            "severity": "info",
-                            "where": {"dataset_column": col},
-                            "rows_affected": int(prev_sum.get("rows") or 0),
-                        }
-                    )
-            # dictionary choices changes
-            prev_choices = prev_sum.get("dict_choices") or {}
-            cur_choices = summary.get("dict_choices") or {}
-            for var, choices in cur_choices.items():
-                prev_c = set(prev_choices.get(var) or [])
-                cur_c = set(choices or [])
-                added = sorted(list(cur_c - prev_c))
-                if added:
-                    findings_dicts.append(
-                        {
-                            "type": "domain_mismatch_since_last_run",
-                            "variable": var,
-                            "severity": "info",
-                            "where": {"variable": var},
-                            "observed_added": added,
-                            "rows_affected": 0,
-                        }
-                    )
-            # validation changes since last run
-            prev_valid = prev_sum.get("dict_validations") or {}
-            cur_valid = summary.get("dict_validations") or {}
-            for var in sorted(set(prev_valid.keys()) | set(cur_valid.keys())):
-                a, b = prev_valid.get(var) or "", cur_valid.get(var) or ""
-                if a != b:
-                    findings_dicts.append(
-                        {
-                            "type": "validation_changed_since_last_run",
-                            "variable": var,
-                            "severity": "info",
-                            "where": {"variable": var},
-                            "observed": {"from": a, "to": b},
-                            "rows_affected": 0,
-                        }
-                    )
-            # required flag changes since last run
-            prev_req = prev_sum.get("dict_required_flags") or {}
-            cur_req = summary.get("dict_required_flags") or {}
-            for var in sorted(set(prev_req.keys()) | set(cur_req.keys())):
-                a, b = bool(prev_req.get(var)), bool(cur_req.get(var))
-                if a != b:
-                    findings_dicts.append(
-                        {
-                            "type": "required_flag_changed",
-                            "variable": var,
-                            "severity": "info",
-                            "where": {"variable": var},
-                            "observed": {"from": a, "to": b},
-                            "rows_affected": 0,
-                        }
-                    )
-
-    # Write outputs
-    result = {"summary": summary, "findings": findings_dicts}
-    findings_path.parent.mkdir(parents=True, exist_ok=True)
-    findings_path.write_text(json.dumps(result, indent=2), encoding="utf-8")
-
-    html = build_report_html(summary, findings_dicts)
-    html_path.parent.mkdir(parents=True, exist_ok=True)
-    html_path.write_text(html, encoding="utf-8")
+    if prev_obj and isinstance(prev_obj, dict):
+        # new columns
+        for col in dataset_cols:
+            if col not in prev_cols:
+                findings_dicts.append(
+                    {
+                        "type": "extra_column_since_last_run",
+                        "variable": col,
+                        "severity": "info",
+                        "where": {"dataset_column": col},
+                        "rows_affected": n_rows,
+                    }
+                )
+        # dropped columns
+        for col in sorted(prev_cols - ds_cols):
+            findings_dicts.append(
+                {
+                    "type": "missing_column_since_last_run",
+                    "variable": col,
+                    "severity": "info",
+                    "where": {"dataset_column": col},
+                    "rows_affected": int(prev_sum.get("rows") or 0),
+                }
+            )
+        # dictionary choices changes
+        prev_choices = prev_sum.get("dict_choices") or {}
+        cur_choices = summary.get("dict_choices") or {}
+        for var, choices in cur_choices.items():
+            prev_c = set(prev_choices.get(var) or [])
+            cur_c = set(choices or [])
+            added = sorted(list(cur_c - prev_c))
+            if added:
+                findings_dicts.append(
+                    {
+                        "type": "domain_mismatch_since_last_run",
+                        "variable": var,
+                        "severity": "info",
+                        "where": {"variable": var},
+                        "observed_added": added,
+                        "rows_affected": 0,
+                    }
+                )
+        # validation changes since last run
+        prev_valid = prev_sum.get("dict_validations") or {}
+        cur_valid = summary.get("dict_validations") or {}
+        for var in sorted(set(prev_valid.keys()) | set(cur_valid.keys())):
+            a, b = prev_valid.get(var) or "", cur_valid.get(var) or ""
+            if a != b:
+                findings_dicts.append(
+                    {
+                        "type": "validation_changed_since_last_run",
+                        "variable": var,
+                        "severity": "info",
+                        "where": {"variable": var},
+                        "observed": {"from": a, "to": b},
+                        "rows_affected": 0,
+                    }
+                )
+        # required flag changes since last run
+        prev_req = prev_sum.get("dict_required_flags") or {}
+        cur_req = summary.get("dict_required_flags") or {}
+        for var in sorted(set(prev_req.keys()) | set(cur_req.keys())):
+            a, b = bool(prev_req.get(var)), bool(cur_req.get(var))
+            if a != b:
+                findings_dicts.append(
+                    {
+                        "type": "required_flag_changed",
+                        "variable": var,
+                        "severity": "info",
+                        "where": {"variable": var},
+                        "observed": {"from": a, "to": b},
+                        "rows_affected": 0,
+                    }
+                )
 
-    # Also print a terse summary
-    print(f"Findings: {len(findings_dicts)} | Rows={summary['rows']} Cols={summary['cols']} Dict={summary['dict_fields']}")
+    return {"summary": summary, "findings": findings_dicts}
 
 
 if __name__ == "__main__":
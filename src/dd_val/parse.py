@@ -9,12 +9,16 @@ standard library. Normalization mirrors the REDCap A–R headers.
 import csv
 import re
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
 
+# Single-choice field types: a dataset value must be one of the listed codes
+CATEGORICAL_TYPES = frozenset({"radio", "dropdown", "yesno", "truefalse"})
 
-@dataclass
+
+@dataclass(slots=True)
 class DictField:
     variable: str
     form_name: str
@@ -37,6 +41,55 @@ class Dictionary:
     by_var: Dict[str, DictField]
     choices: Dict[str, List[Tuple[str, str]]]
     matrix_groups: Dict[str, List[str]]
+    # Positions in `fields` per matrix group, in ascending order
+    matrix_positions: Dict[str, List[int]] = field(default_factory=dict)
+    # Rename maps keyed by dataset header tuple (see checks._build_rename_map)
+    rename_maps: Dict[Tuple[str, ...], Dict[str, str]] = field(default_factory=dict, repr=False, compare=False)
+
+    @cached_property
+    def checkbox_cols(self) -> Dict[str, List[str]]:
+        """Expected `var___code` dataset columns per checkbox variable."""
+        return {
+            f.variable: [f"{f.variable}___{code}" for code, _lbl in f.choices]
+            for f in self.fields
+            if f.field_type == "checkbox"
+        }
+
+    @cached_property
+    def categorical_codes(self) -> List[Tuple[str, FrozenSet[str]]]:
+        """(variable, allowed codes) per single-choice field, in dictionary order."""
+        return [
+            (f.variable, frozenset(code for code, _lbl in f.choices))
+            for f in self.fields
+            if f.field_type in CATEGORICAL_TYPES
+        ]
+
+    @cached_property
+    def note_units(self) -> List[Tuple[str, str]]:
+        """(variable, unit) for fields whose field_note declares `units=<unit>` (lowercased)."""
+        out = []
+        for f in self.fields:
+            note = (f.raw.get("field_note") or "").lower()
+            if "units=" in note:
+                unit = note.split("units=", 1)[1].split()
+                if unit:  # bare "units=" declares nothing
+                    out.append((f.variable, unit[0]))
+        return out
+
+    @cached_property
+    def checkbox_vars(self) -> FrozenSet[str]:
+        return frozenset(self.checkbox_cols)
+
+    @cached_property
+    def expected_columns(self) -> FrozenSet[str]:
+        """Dataset columns implied by the dictionary (checkboxes expanded)."""
+        cols = set()
+        for f in self.fields:
+            if f.field_type == "checkbox":
+                cols.update(self.checkbox_cols[f.variable])
+            else:
+                cols.add(f.variable)
+        return frozenset(cols)
 
 
 def _parse_choices(field_type: str, raw: str) -> List[Tuple[str, str]]:
@@ -76,6 +129,7 @@ def load_dictionary(path: str | Path) -> Dictionary:
     fields: List[DictField] = []
     by_var: Dict[str, DictField] = {}
     matrix_groups: Dict[str, List[str]] = defaultdict(list)
+    matrix_positions: Dict[str, List[int]] = defaultdict(list)
 
     for r in rows:
         variable = r.get("variable_name", "").strip()
@@ -105,12 +159,19 @@ def load_dictionary(path: str | Path) -> Dictionary:
             matrix_group=matrix,
             raw=r,
         )
-        fields.append(field)
-        by_var[variable] = field
         if matrix:
             matrix_groups[matrix].append(variable)
+            matrix_positions[matrix].append(len(fields))
+        fields.append(field)
+        by_var[variable] = field
 
-    return Dictionary(fields=fields, by_var=by_var, choices={f.variable: f.choices for f in fields}, matrix_groups=matrix_groups)
+    return Dictionary(
+        fields=fields,
+        by_var=by_var,
+        choices={f.variable: f.choices for f in fields},
+        matrix_groups=matrix_groups,
+        matrix_positions=matrix_positions,
+    )
 
 
 def load_dataset_headers(path: str | Path) -> List[str]:
@@ -124,19 +185,50 @@ def load_dataset_headers(path: str | Path) -> List[str]:
     return headers
 
 
-def iter_dataset_rows(path: str | Path) -> Iterable[Dict[str, str]]:
-    """Stream dataset rows as dicts (CSV)."""
+def iter_dataset_records(path: str | Path) -> Iterator[List[str]]:
+    """Stream the dataset as lists: the header row first, then the data rows.
+
+    Blank lines are skipped and short rows are padded with "" to the header
+    width. Look up columns with `column_index(header)`.
+    """
     with open(path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        yield header
+        width = len(header)
         for r in reader:
+            if not r:
+                continue
+            if len(r) < width:
+                r += [""] * (width - len(r))
             yield r
 
 
+def column_index(header: List[str]) -> Dict[str, int]:
+    """Column name -> position (last occurrence wins, as with DictReader)."""
+    return {c: i for i, c in enumerate(header)}
+
+
 _ymd = re.compile(r"^\d{4}-\d{2}-\d{2}$")
-_mdy = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
+# Plain ASCII forms accepted without the int()/float() call; anything else
+# falls back to the builtin so edge cases (" 1", "1_0", "inf", "1e5") keep
+# their exact semantics.
+_int_fast = re.compile(r"-?[0-9]+").fullmatch
+_num_fast = re.compile(r"-?[0-9]+(?:\.[0-9]+)?").fullmatch
+# Fast reject: int()/float() need a decimal digit, except float's inf/nan words
+_has_digit = re.compile(r"\d").search
+_FLOAT_WORDS = frozenset({"inf", "infinity", "nan"})
+_ymd_match = _ymd.match
+_date_kind = re.compile(r"^(?:(?P<date_mdy>\d{1,2}/\d{1,2}/\d{4})|(?P<date_ymd>\d{4}-\d{2}-\d{2}))$").match
 
 
 def is_int(s: str) -> bool:
+    if _int_fast(s):
+        return True
+    if not _has_digit(s):
+        return False
     try:
         int(s)
         return True
@@ -145,6 +237,10 @@ def is_int(s: str) -> bool:
 
 
 def is_num(s: str) -> bool:
+    if _num_fast(s):
+        return True
+    if not _has_digit(s) and s.strip().lstrip("+-").lower() not in _FLOAT_WORDS:
+        return False
     try:
         float(s)
         return True
@@ -153,12 +249,9 @@ def is_num(s: str) -> bool:
 
 
 def is_date_ymd(s: str) -> bool:
-    return bool(_ymd.match(s))
+    return _ymd_match(s) is not None
 
 
 def guess_date_format(s: str) -> str:
-    if _mdy.match(s):
-        return "date_mdy"
-    if _ymd.match(s):
-        return "date_ymd"
-    return "string"
+    m = _date_kind(s)
+    return m.lastgroup if m else "string"
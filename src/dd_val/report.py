@@ -6,7 +6,9 @@ Outputs a single-page report with sections and a compact Query Pack.
 """
 
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
 
 
 def _html_escape(s: str) -> str:
@@ -19,6 +21,11 @@ def _html_escape(s: str) -> str:
     )
 
 
+# Finding types, severities and section titles come from a small fixed
+# vocabulary; escape each distinct one once
+_escape_token = lru_cache(maxsize=256)(_html_escape)
+
+
 def _li(text: str) -> str:
     return f"<li>{_html_escape(text)}</li>"
 
@@ -34,14 +41,17 @@ def _render_finding(f: dict) -> str:
     if rows_affected is not None:
         extra.append(f"rows_affected={rows_affected}")
     # Show observed_added for since-last-run domain changes
-    if isinstance(f.get("observed_added"), list) and f["observed_added"]:
-        extra.append("added=" + ", ".join(str(x) for x in f["observed_added"][:5]))
+    added = f.get("observed_added")
+    if isinstance(added, list) and added:
+        extra.append("added=" + ", ".join(str(x) for x in added[:5]))
     # Highlight primary column/location when present
     if isinstance(where, dict):
-        if where.get("dataset_column"):
-            extra.append(f"column={where['dataset_column']}")
-        elif where.get("variable") and where["variable"] != variable:
-            extra.append(f"where={where['variable']}")
+        where_col = where.get("dataset_column")
+        where_var = where.get("variable")
+        if where_col:
+            extra.append(f"column={where_col}")
+        elif where_var and where_var != variable:
+            extra.append(f"where={where_var}")
     # Tailored extras for specific info types
     if ftype == "export_mode_labels_detected":
         ob = f.get("observed", {}) or {}
@@ -53,7 +63,7 @@ def _render_finding(f: dict) -> str:
             if "suppressed_domain_findings" in ob:
                 extra.append(f"suppressed_domain_findings={ob['suppressed_domain_findings']}")
     if ftype == "longitudinal_context_detected":
-        where_cols = f.get("where", {}).get("columns")
+        where_cols = where.get("columns")
         if where_cols:
             extra.append(f"present={where_cols}")
         ob = f.get("observed", {}) or {}
@@ -71,64 +81,98 @@ def _render_finding(f: dict) -> str:
     if examples:
         extra.append(f"examples: {', '.join(examples[:5])}")
     extra_str = f" — {'; '.join(extra)}" if extra else ""
-    return f"<li><code>{_html_escape(variable)}</code> — <b>{_html_escape(ftype)}</b> [{_html_escape(sev)}]{_html_escape(extra_str)}</li>"
+    return f"<li><code>{_html_escape(variable)}</code> — <b>{_escape_token(ftype)}</b> [{_escape_token(sev)}]{_html_escape(extra_str)}</li>"
+
+
+def _rename_drift_line(f: dict, v, ex: list) -> str:
+    newv = (f.get("observed", {}) or {}).get("new")
+    if newv:
+        return f"{v}: Appears renamed in dataset to '{newv}'. Align names or update dictionary."
+    return f"{v}: Appears renamed in dataset. Align names or update dictionary."
+
+
+# Query Pack line per finding type: (finding, variable, examples) -> text
+_QUERY_PACK_LINES: Dict[str, Callable[[dict, Any, list], str]] = {
+    "missing_column_in_data": lambda f, v, ex: f"{v}: Defined in dictionary but missing from dataset. Should this be added to the next export or removed from the dictionary?",
+    "extra_column_in_data": lambda f, v, ex: f"{v}: Present in dataset but not in dictionary. Should we add it to the dictionary or exclude it from analysis?",
+    "domain_mismatch": lambda f, v, ex: f"{v}: Observed values {ex[:5]} not in allowed codes {f.get('expected')}. Map these or revise Column F choices?",
+    "type_mismatch": lambda f, v, ex: f"{v}: Validated as {f.get('expected')} but some values do not parse (e.g., {ex[:3]}). Should validation change or data be recoded?",
+    "unit_anomaly": lambda f, v, ex: f"{v}: Numeric values suggest alternate unit for a subset. Confirm units or recode.",
+    "checkbox_expansion_mismatch": lambda f, v, ex: f"{v}: Checkbox columns do not match choices. Align dataset columns with Column F codes.",
+    "rename_drift": _rename_drift_line,
+    "missing_primary_key_column": lambda f, v, ex: f"{v}: Primary key column missing. Add this column to the export.",
+    "duplicate_primary_key_values": lambda f, v, ex: f"{v}: Duplicate primary key values exist (e.g., {ex[:3]}). Deduplicate or fix export.",
+    "required_field_missing_rate_high": lambda f, v, ex: f"{v}: Required field has high missing rate. Review branching or enforce entry.",
+    "export_mode_labels_detected": lambda f, v, ex: f"{v}: Dataset appears label-exported. Re-export in raw (codes) or map labels.",
+    "matrix_nonconsecutive": lambda f, v, ex: f"{v}: Matrix fields are not consecutive in dictionary. Reorder so they appear together.",
+    "branching_mismatch": lambda f, v, ex: f"{v}: Values appear outside branching logic. Confirm logic or data.",
+}
 
 
 def _query_pack_line(f: dict) -> str:
     t = f.get("type")
     v = f.get("variable")
-    ex = f.get("examples", []) or []
-    if t == "missing_column_in_data":
-        return f"{v}: Defined in dictionary but missing from dataset. Should this be added to the next export or removed from the dictionary?"
-    if t == "extra_column_in_data":
-        return f"{v}: Present in dataset but not in dictionary. Should we add it to the dictionary or exclude it from analysis?"
-    if t == "domain_mismatch":
-        exp = f.get("expected")
-        return f"{v}: Observed values {ex[:5]} not in allowed codes {exp}. Map these or revise Column F choices?"
-    if t == "type_mismatch":
-        exp = f.get("expected")
-        return f"{v}: Validated as {exp} but some values do not parse (e.g., {ex[:3]}). Should validation change or data be recoded?"
-    if t == "unit_anomaly":
-        return f"{v}: Numeric values suggest alternate unit for a subset. Confirm units or recode."
-    if t == "checkbox_expansion_mismatch":
-        return f"{v}: Checkbox columns do not match choices. Align dataset columns with Column F codes."
-    if t == "rename_drift":
-        newv = (f.get("observed", {}) or {}).get("new")
-        if newv:
-            return f"{v}: Appears renamed in dataset to '{newv}'. Align names or update dictionary."
-        return f"{v}: Appears renamed in dataset. Align names or update dictionary."
-    if t == "missing_primary_key_column":
-        return f"{v}: Primary key column missing. Add this column to the export."
-    if t == "duplicate_primary_key_values":
-        return f"{v}: Duplicate primary key values exist (e.g., {ex[:3]}). Deduplicate or fix export."
-    if t == "required_field_missing_rate_high":
-        return f"{v}: Required field has high missing rate. Review branching or enforce entry."
-    if t == "export_mode_labels_detected":
-        return f"{v}: Dataset appears label-exported. Re-export in raw (codes) or map labels."
-    if t == "matrix_nonconsecutive":
-        return f"{v}: Matrix fields are not consecutive in dictionary. Reorder so they appear together."
-    if t == "branching_mismatch":
-        return f"{v}: Values appear outside branching logic. Confirm logic or data."
-    return f"{v}: {t} — please review."
+    line = _QUERY_PACK_LINES.get(t)
+    if line is None:
+        return f"{v}: {t} — please review."
+    return line(f, v, f.get("examples", []) or [])
+
+
+_HEAD = """
+<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <title>DD-Val Report</title>
+  <style>
+    body { font-family: -apple-system, system-ui, sans-serif; margin: 24px; }
+    h1,h2,h3 { margin: 12px 0; }
+    code { background: #f2f2f2; padding: 1px 4px; border-radius: 3px; }
+    .summary { background: #fafafa; border: 1px solid #eee; padding: 12px; }
+    .notes { color: #555; font-size: 0.95em; margin-top: 12px; }
+  </style>
+  </head>
+<body>
+  <h1>DD-Val Report</h1>
+  <div class="summary">
+"""
+_LABEL_EXPORT_NOTE = (
+    "<div class='notes'><b>Note:</b> Domain mismatches were suppressed because the dataset appears label-exported.</div>"
+)
 
 
 def build_report_html(summary: dict, findings: List[dict]) -> str:
+    return "".join(iter_report_html(summary, findings))
+
+
+def write_report_html(path: str | Path, summary: dict, findings: List[dict]) -> None:
+    """Render the report straight into `path`, chunk by chunk."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(iter_report_html(summary, findings))
+
+
+def iter_report_html(summary: dict, findings: List[dict]) -> Iterator[str]:
+    """Yield the report HTML in document order; the chunks concatenate to one page."""
     now = datetime.now().isoformat(timespec="seconds")
-    errors = [f for f in findings if f.get("severity") == "error"]
-    warns = [f for f in findings if f.get("severity") == "warn"]
-    infos = [f for f in findings if f.get("severity") == "info"]
-    has_label_export = any(f.get("type") == "export_mode_labels_detected" for f in findings)
+    # Bucket by severity in one pass; other severities are not rendered
+    errors: List[dict] = []
+    warns: List[dict] = []
+    infos: List[dict] = []
+    buckets = {"error": errors, "warn": warns, "info": infos}
+    has_label_export = False
+    for f in findings:
+        bucket = buckets.get(f.get("severity"))
+        if bucket is not None:
+            bucket.append(f)
+        if f.get("type") == "export_mode_labels_detected":
+            has_label_export = True
     # Sort Query Pack items by variable then type (groups by variable)
-    err_sorted = sorted([f for f in findings if f.get("severity") == "error"], key=lambda x: (x.get("variable",""), x.get("type","")))
-    warn_sorted = sorted([f for f in findings if f.get("severity") == "warn"], key=lambda x: (x.get("variable",""), x.get("type","")))
+    err_sorted = sorted(errors, key=lambda x: (x.get("variable",""), x.get("type","")))
+    warn_sorted = sorted(warns, key=lambda x: (x.get("variable",""), x.get("type","")))
     qpack_errors = [_query_pack_line(f) for f in err_sorted]
     qpack_warns = [_query_pack_line(f) for f in warn_sorted]
 
-    def section(title: str, items: List[str]) -> str:
-        if not items:
-            return f"<h3>{_html_escape(title)}</h3><p>None</p>"
-        return f"<h3>{_html_escape(title)}</h3><ul>" + "\n".join(items) + "</ul>"
-
     # Primary key summary line
     pk = summary.get('primary_key')
     pk_line = ''
@@ -143,41 +187,31 @@ def build_report_html(summary: dict, findings: List[dict]) -> str:
         extra_s = f" ({'; '.join(extra)})" if extra else ''
         pk_line = f"<div><b>Primary key:</b> {pk}{extra_s}</div>"
 
-    html = f"""
-<!doctype html>
-<html>
-<head>
-  <meta charset=\"utf-8\" />
-  <title>DD-Val Report</title>
-  <style>
-    body {{ font-family: -apple-system, system-ui, sans-serif; margin: 24px; }}
-    h1,h2,h3 {{ margin: 12px 0; }}
-    code {{ background: #f2f2f2; padding: 1px 4px; border-radius: 3px; }}
-    .summary {{ background: #fafafa; border: 1px solid #eee; padding: 12px; }}
-    .notes {{ color: #555; font-size: 0.95em; margin-top: 12px; }}
-  </style>
-  </head>
-<body>
-  <h1>DD-Val Report</h1>
-  <div class=\"summary\">
-    <div><b>Generated:</b> {now}</div>
-    <div><b>Rows:</b> {summary.get('rows', 0)} | <b>Cols:</b> {summary.get('cols', 0)} | <b>Dict fields:</b> {summary.get('dict_fields', 0)}</div>
-    {pk_line}
-  </div>
-  {section('Must-fix (errors)', [_render_finding(f) for f in errors])}
-  {section('Nice-to-fix (warnings)', [_render_finding(f) for f in warns])}
-  {section('Info', [_render_finding(f) for f in infos])}
-  {('<div class=\'notes\'><b>Note:</b> Domain mismatches were suppressed because the dataset appears label-exported.</div>' if has_label_export else '')}
-  <h3>Query Pack</h3>
-  <h4>Errors ({len(qpack_errors)})</h4>
-  <ul>
-    {''.join(_li(x) for x in qpack_errors) if qpack_errors else '<li>None</li>'}
-  </ul>
-  <h4>Warnings ({len(qpack_warns)})</h4>
-  <ul>
-    {''.join(_li(x) for x in qpack_warns) if qpack_warns else '<li>None</li>'}
-  </ul>
-</body>
-</html>
-"""
-    return html
+    yield _HEAD
+    yield f"    <div><b>Generated:</b> {now}</div>\n"
+    yield (
+        f"    <div><b>Rows:</b> {summary.get('rows', 0)} | <b>Cols:</b> {summary.get('cols', 0)}"
+        f" | <b>Dict fields:</b> {summary.get('dict_fields', 0)}</div>\n"
+    )
+    yield f"    {pk_line}\n  </div>\n"
+
+    for title, items in (("Must-fix (errors)", errors), ("Nice-to-fix (warnings)", warns), ("Info", infos)):
+        yield f"  <h3>{_escape_token(title)}</h3>"
+        if items:
+            yield "<ul>"
+            for i, f in enumerate(items):
+                yield ("\n" if i else "") + _render_finding(f)
+            yield "</ul>\n"
+        else:
+            yield "<p>None</p>\n"
+    yield f"  {_LABEL_EXPORT_NOTE if has_label_export else ''}\n"
+
+    yield "  <h3>Query Pack</h3>\n"
+    for title, lines in (("Errors", qpack_errors), ("Warnings", qpack_warns)):
+        yield f"  <h4>{title} ({len(lines)})</h4>\n  <ul>\n    "
+        if lines:
+            yield from map(_li, lines)
+        else:
+            yield "<li>None</li>"
+        yield "\n  </ul>\n"
+    yield "</body>\n</html>\n"